@@ -1,21 +1,41 @@
-import pygame
+from typing import Tuple
+
 from pygame import Surface
-from pygame.sprite import Sprite
 
+from atlas import sprite_atlas
+from compact_sprite import CompactSprite
 from settings import Settings
 
 
-class Alien(Sprite):
-    """表示单个外星人的类"""
+class Alien(CompactSprite):
+    """表示单个外星人的类
+
+    屏幕、设置和图像由所有外星人共享, 保存在类属性中, 由share()设置, 实例只保存位置
+    """
+
+    # 基类没有定义__slots__, 外星人实例依然有__dict__, __slots__只限定外星人自身的属性
+    __slots__ = ('rect', 'x', 'y', 'prev_x', 'prev_y')
+
+    # 所有外星人共享的屏幕、设置和图像
+    screen: Surface = None
+    settings: Settings = None
+    image: Surface = None
+    # 屏幕的右边缘, 边缘检测时无需每次获取屏幕的rect
+    screen_right = 0
+
+    @classmethod
+    def share(cls, screen: Surface, settings: Settings) -> None:
+        """设置所有外星人共享的屏幕、设置和图像, 须在构建图集后、创建外星人前调用"""
+        cls.screen = screen
+        cls.settings = settings
+        cls.image = sprite_atlas.get('alien')
+        cls.screen_right = screen.get_rect().right
 
-    def __init__(self, screen: Surface, settings: Settings) -> None:
+    def __init__(self) -> None:
         """初始化外星人并设置其起始位置"""
         super(Alien, self).__init__()
-        self.screen = screen
-        self.settings = settings
 
-        # 加载外星人图像并设置其rect属性
-        self.image = pygame.image.load('images/alien.bmp')
+        # 设置外星人的rect属性
         self.rect = self.image.get_rect()
 
         # 每个外星人最初都在屏幕左上角附近
@@ -25,16 +45,33 @@ class Alien(Sprite):
         # 存储外星人的准确位置
         self.x = float(self.rect.x)
         self.y = float(self.rect.y)
+        # 上一模拟步结束时的位置, 用于渲染插值
+        self.prev_x = self.x
+        self.prev_y = self.y
 
-    def update(self) -> None:
-        """向左或向右移动外星人"""
-        self.x += self.settings.alien_speed * self.settings.fleet_direction
+    def reset(self, x: float, y: float) -> None:
+        """将外星人放到指定位置, 外星人被重复使用时调用"""
+        self.x = float(x)
+        self.y = float(y)
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.rect.x = self.x
+        self.rect.y = self.y
 
-    def check_edges(self) -> bool:
-        """检查外星人是否撞到了把屏幕边缘"""
-        screen_rect = self.screen.get_rect()
-        if self.rect.right >= screen_rect.right or self.rect.left <= 0:
-            return True
+    def update(self, dt: float) -> None:
+        """向左或向右移动外星人, dt为模拟步长(秒)"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        settings = self.settings
+        self.x += settings.alien_speed * settings.fleet_direction * dt
+        self.rect.x = self.x
 
-        return False
+    def interpolate(self, alpha: float) -> Tuple[float, float]:
+        """返回上一模拟步与当前模拟步之间插值后的绘制位置"""
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def check_edges(self) -> bool:
+        """检查外星人是否撞到了屏幕边缘"""
+        rect = self.rect
+        return rect.right >= self.screen_right or rect.left <= 0
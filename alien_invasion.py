@@ -1,112 +1,273 @@
+import argparse
+import os
 import sys
-from time import sleep
-from typing import Tuple
+from functools import partial
+from time import perf_counter
+from typing import Dict, Optional, Tuple
 
 import pygame
 from pygame.event import Event
 
-from alien import Alien
-from bullet import Bullet
+from assets import font_cache, image_cache
+from atlas import scale_image, sprite_atlas
+from bullet import BulletPool
 from button import Button
-from game_stats import GameStats
+from collision import CollisionEngine
+from controls import REDRAW_EVENTS, FireControl, key_table, restrict_event_queue
+from entity_store import EntityStore
+from fleet import Fleet
+from formation import formation_cache
+from game_loop import GameLoop
+from game_stats import GameState, GameStats
+from input_source import EventQueueInput
+from loader import AssetLoader, LoadingScreen
+from profiler import FrameProfiler, ProfilerOverlay
+from renderer import Renderer
+from score_store import ScoreStore
 from scoreboard import Scoreboard
-from settings import Settings
+from settings import PRESETS, Settings, parse_assignment, parse_value
 from ship import Ship
+from telemetry import Telemetry
 
 
 class AlienInvasion:
     """管理游戏资源和行为的类"""
 
-    def __init__(self) -> None:
-        """初始化游戏并创建游戏资源"""
+    def __init__(self, settings: Optional[Settings] = None, headless: bool = False,
+                 input_source=None) -> None:
+        """初始化游戏并创建游戏资源
+
+        headless为True时不创建窗口, 游戏逻辑在内存中的Surface上运行, 用于批量模拟;
+        input_source提供每次处理事件时的事件列表, 默认读取pygame事件队列
+        """
+        self.headless = headless
+        if headless:
+            # 无显示器的服务器上也能初始化pygame
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        # 启动各阶段距开始初始化的时间(秒): 窗口显示、资源加载完成、绘制第一帧
+        self._startup_start = perf_counter()
+        self.startup_times: Dict[str, float] = {}
         pygame.init()
-        self.settings = Settings()
+        self.settings = settings if settings is not None else Settings()
+        self.input_source = input_source if input_source is not None else EventQueueInput()
 
-        self.screen = pygame.display.set_mode(
-            (self.settings.screen_width, self.settings.screen_height))
+        size = self.settings.screen_width, self.settings.screen_height
+        if headless:
+            self.screen = pygame.Surface(size)
+        else:
+            self.screen = pygame.display.set_mode(size)
+            pygame.display.set_caption(self.settings.title)
+            restrict_event_queue()
         self.screen_rect = self.screen.get_rect()
-        pygame.display.set_caption(self.settings.title)
+        self._mark_startup('window')
+
+        # 排行榜由得分存储的后台线程读取, 无窗口模式(批量模拟、回放)不读写得分数据库
+        self.scores = None
+        if not headless and self.settings.score_db:
+            self.scores = ScoreStore(self.settings.score_db, self.settings.player_name,
+                                     self.settings.preset, self.settings.leaderboard_size,
+                                     self.settings.high_score_file)
+        # 遥测事件由后台线程写入文件, 无窗口模式(批量模拟、回放)不记录
+        self.telemetry = None
+        if not headless and self.settings.telemetry_dir:
+            self.telemetry = Telemetry(self.settings.telemetry_dir,
+                                       self.settings.telemetry_max_bytes,
+                                       self.settings.telemetry_backups,
+                                       self.settings.telemetry_interval)
+        self._load_assets()
 
         # 创建一个用于存储游戏信息的实例, 并创建记分牌
-        self.stats = GameStats(self.settings)
+        self.stats = GameStats(self.settings, self.scores)
         self.sb = Scoreboard(self.screen, self.settings, self.stats)
 
-        # 创建外星人编组
-        self.aliens = pygame.sprite.Group()
-        # 创建子弹编组
-        self.bullets = pygame.sprite.Group()
+        # 将精灵图像和记分牌的数字字形打包到一个图集中
+        self._build_atlas()
+
+        # 创建外星人群编组
+        self.aliens = Fleet(self.screen, self.settings)
         # 创建飞船
         self.ship = Ship(self.screen, self.settings)
+        # 创建按住开火键时控制射速的开火控制器, 并建立事件和按键的分派表
+        self.fire_control = FireControl(self.settings.fire_rate)
+        self._init_controls()
+        # 创建子弹对象池, 其中的成员即为飞行中的子弹
+        self.bullets = BulletPool(self.screen, self.settings, self.ship)
+
+        # 创建碰撞检测引擎
+        self.collisions = CollisionEngine(self.settings.collision_cell_size,
+                                          self.settings.collision_grid,
+                                          self.settings.fleet_rows)
+
+        # 可选的数组实体存储, 启用时外星人和子弹精灵仅用于渲染
+        self.store = None
+        if self.settings.entity_store and EntityStore.available:
+            self.store = EntityStore(self.settings, self.screen_rect)
 
         # 创建外星人群
         self._create_fleet()
 
         # 创建Play按钮
-        self.play_button = Button(self.screen, 'Play')
-
-    def get_number_aliens_x(self, alien: Alien) -> int:
-        """计算每行可容纳多少个外星人"""
-        alien_width = alien.rect.width
-        screen_width = self.settings.screen_width
-        available_space_x = screen_width - alien_width
-        # 外星人的间距为外星人宽度
-        return available_space_x // (2 * alien_width)
-
-    def get_number_rows(self, alien: Alien) -> int:
-        """计算屏幕可容纳多少行外星人"""
-        alien_height = alien.rect.height
-        ship_height = self.ship.rect.height
-        screen_height = self.settings.screen_height
-        available_space_y = screen_height - ship_height - 3 * alien_height
-        return available_space_y // (2 * alien_height)
-
-    def _create_alien(self, row_number: int, alien_number: int) -> None:
-        """创建一个外星人并将其放置在当前行"""
-        alien = Alien(self.screen, self.settings)
-        alien_width, alien_height = alien.rect.size
-        alien.x = alien_width + 2 * alien_width * alien_number
-        alien.y = alien_height + 2 * alien_height * row_number
-        alien.rect.x = alien.x
-        alien.rect.y = alien.y
-        self.aliens.add(alien)
+        self.play_button = Button(self.screen, 'Play', self.settings.font_name)
+
+        # 创建渲染器, 第一帧完整重绘, 覆盖加载进度条
+        self.renderer = Renderer(self.screen, self.settings.bg_color,
+                                 self.settings.dirty_rects)
+
+        # 创建固定时间步长的主循环计时器
+        self.loop = GameLoop(self.settings.tick_rate, self.settings.max_fps)
+
+        # 性能分析器, 未启用时不包装任何方法, 没有额外开销
+        self.profiler = None
+        self.profiler_overlay = None
+        if self.settings.profile:
+            self._init_profiler()
+
+    def _mark_startup(self, stage: str) -> None:
+        """记录启动阶段完成的时间"""
+        self.startup_times[stage] = perf_counter() - self._startup_start
+
+    def _load_assets(self) -> None:
+        """在后台线程中加载图像、字体和排行榜, 有窗口时同时显示加载进度"""
+        settings = self.settings
+        tasks = [
+            # 设置显示模式后加载图像, 使其转换为显示格式
+            ('images', lambda: image_cache.preload((settings.ship_image,
+                                                    settings.alien_image))),
+            ('fonts', lambda: font_cache.preload(settings.font_name, (24, 48))),
+        ]
+        if self.scores is not None:
+            tasks.append(('scores', self.scores.leaderboard))
+        loader = AssetLoader(tasks).start()
+
+        if not self.headless:
+            LoadingScreen(self.screen, settings.bg_color).run(loader, self._quit)
+        loader.result()
+        self._mark_startup('loaded')
+
+    def _build_atlas(self) -> None:
+        """构建精灵图集, 飞船、外星人和子弹按resolution_scale预先缩放"""
+        settings = self.settings
+        scale = settings.resolution_scale
+        bullet = pygame.Surface((max(1, round(settings.bullet_width * scale)),
+                                 max(1, round(settings.bullet_height * scale))))
+        bullet.fill(settings.bullet_color)
+        images = {
+            'ship': scale_image(image_cache.get(settings.ship_image), scale),
+            'alien': scale_image(image_cache.get(settings.alien_image), scale),
+            'bullet': bullet,
+        }
+        glyphs = self.sb.text.glyphs
+        images.update((f'glyph:{char}', glyph) for char, glyph in glyphs.items())
+        sprite_atlas.build(images)
+
+        # 记分牌改用图集中的字形拼接数字
+        for char in glyphs:
+            glyphs[char] = sprite_atlas.get(f'glyph:{char}')
+
+    def _init_controls(self) -> None:
+        """根据按键绑定建立事件类型和按键到处理函数的分派表"""
+        self._event_handlers = {
+            pygame.QUIT: lambda event: self.exit_game(),
+            pygame.KEYDOWN: self._check_keydown_event,
+            pygame.KEYUP: self._check_keyup_event,
+            # 使用事件自带的坐标, 录像回放时不依赖真实鼠标位置
+            pygame.MOUSEBUTTONDOWN: lambda event: self._check_play_button(event.pos),
+        }
+        # 窗口内容丢失后, 脏矩形模式只重绘变化的区域不足以恢复画面
+        for event_type in REDRAW_EVENTS:
+            self._event_handlers[event_type] = lambda event: self.renderer.invalidate()
+
+        # 按下和松开绑定到各动作的按键时调用的函数
+        on_key_down = {
+            'quit': self.exit_game,
+            'start': self._start_game,
+            'left': partial(setattr, self.ship, 'moving_left', True),
+            'right': partial(setattr, self.ship, 'moving_right', True),
+            'fire': self.fire_control.press,
+        }
+        on_key_up = {
+            'left': partial(setattr, self.ship, 'moving_left', False),
+            'right': partial(setattr, self.ship, 'moving_right', False),
+            'fire': self.fire_control.release,
+        }
+        keys = key_table(self.settings.key_bindings)
+        self._key_down = {key: on_key_down[action] for key, action in keys.items()}
+        self._key_up = {key: on_key_up[action] for key, action in keys.items()
+                        if action in on_key_up}
+
+    def _init_profiler(self) -> None:
+        """用记录耗时的包装函数替换主循环各阶段的方法"""
+        self.profiler = profiler = FrameProfiler()
+        self._check_events = profiler.wrap('check_events', self._check_events)
+        self.ship.update = profiler.wrap('ship_update', self.ship.update)
+        self._update_bullets = profiler.wrap('update_bullets', self._update_bullets)
+        self._check_bullet_alien_collisions = profiler.wrap(
+            'bullet_alien_collisions', self._check_bullet_alien_collisions)
+        self._update_aliens = profiler.wrap('update_aliens', self._update_aliens)
+        self._update_screen = profiler.wrap('update_screen', self._update_screen)
+        if self.settings.profile_overlay and not self.headless:
+            self.profiler_overlay = ProfilerOverlay(profiler, self.screen,
+                                                    font_name=self.settings.font_name)
 
     def _create_fleet(self) -> None:
-        """创建外星人群"""
-        alien = Alien(self.screen, self.settings)
-        number_rows = self.get_number_rows(alien)
-        number_aliens_x = self.get_number_aliens_x(alien)
+        """按阵型创建外星人群, 重复使用已创建的外星人"""
+        alien_size = sprite_atlas.get('alien').get_size()
+        layout = formation_cache.get(self.settings.formation, self.screen_rect.size,
+                                     alien_size, self.ship.rect.height)
+        self.aliens.respawn(layout)
 
-        # 创建外星人群
-        for row_number in range(number_rows):
-            for alien_number in range(number_aliens_x):
-                self._create_alien(row_number, alien_number)
+        # 为新的外星人群建立碰撞索引, 外星人群整体移动时索引依然有效
+        self.collisions.rebuild(self.aliens, self.aliens.origin)
+        if self.store is not None:
+            self.store.load_fleet(self.aliens)
 
     def _fire_bullet(self) -> None:
-        """创建一颗子弹并将其加入编组bullets中"""
-        if len(self.bullets) < self.settings.bullet_limit:
-            bullet = Bullet(self.screen, self.settings, self.ship)
-            self.bullets.add(bullet)
+        """从对象池发射一颗子弹, 飞行中的子弹数量达到上限时不发射"""
+        if self.stats.state is GameState.PLAYING:
+            bullet = self.bullets.fire()
+            if bullet is None:
+                return
+            if self.store is not None:
+                self.store.add_bullet(bullet)
+            self.stats.shots += 1
+            if self.telemetry is not None:
+                self.telemetry.emit('shot', level=self.stats.level, x=bullet.rect.centerx,
+                                    bullets=len(self.bullets))
+
+    def _clear_bullets(self) -> None:
+        """删除所有子弹"""
+        self.bullets.empty()
+        if self.store is not None:
+            self.store.clear_bullets()
 
     def _start_game(self) -> None:
         """开始游戏"""
-        # 重置游戏的统计信息
+        # 保存中途重新开始的上一局, 然后重置游戏的统计信息
+        self.stats.save_score()
         self.stats.reset_stats()
-        self.stats.game_active = True
+        self.stats.state = GameState.PLAYING
 
         # 重置记分牌图像
         self.sb.prep_images()
 
         # 清空余下的外星人和子弹
         self.aliens.empty()
-        self.bullets.empty()
+        self._clear_bullets()
 
         # 创建一群新的外星人并让飞船居中
         self._create_fleet()
         self.ship.center_ship()
+        self.fire_control.reset()
 
         # 重置游戏的动态设置
         self.settings.initialize_dynamic_settings()
 
+        if self.telemetry is not None:
+            self.telemetry.emit('game_start', preset=self.settings.preset,
+                                formation=self.settings.formation,
+                                screen=list(self.screen_rect.size))
+            self._emit_level_start()
+
         # 隐藏鼠标光标
         pygame.mouse.set_visible(False)
 
@@ -117,48 +278,45 @@ class AlienInvasion:
             self._start_game()
 
     def _check_keyup_event(self, event: Event) -> None:
-        """响应松开"""
-        if event.key == pygame.K_LEFT:
-            self.ship.moving_left = False
-        elif event.key == pygame.K_RIGHT:
-            self.ship.moving_right = False
+        """按绑定表响应松开"""
+        handler = self._key_up.get(event.key)
+        if handler is not None:
+            handler()
 
     def _check_keydown_event(self, event: Event) -> None:
-        """响应按键"""
-        if event.key == pygame.K_q:  # 按下键盘Q键退出游戏
-            self.exit_game()
-        elif event.key == pygame.K_p:  # 按下键盘P键开始游戏
-            self._start_game()
-        elif event.key == pygame.K_LEFT:  # 按下键盘方向左键左移飞船
-            self.ship.moving_left = True
-        elif event.key == pygame.K_RIGHT:  # 按下键盘方向右键右移飞船
-            self.ship.moving_right = True
-        elif event.key == pygame.K_SPACE:  # 按下键盘空格键飞船开火
-            self._fire_bullet()
+        """按绑定表响应按键, 开火键只记录按下状态, 由模拟步决定何时发射"""
+        handler = self._key_down.get(event.key)
+        if handler is not None:
+            handler()
 
     def _check_events(self) -> None:
-        """响应按键和鼠标事件"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                self.exit_game()
-            elif event.type == pygame.KEYUP:
-                self._check_keyup_event(event)
-            elif event.type == pygame.KEYDOWN:
-                self._check_keydown_event(event)
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                self._check_play_button(mouse_pos)
+        """按事件类型分派按键和鼠标事件"""
+        handlers = self._event_handlers
+        for event in self.input_source.poll(self):
+            handler = handlers.get(event.type)
+            if handler is not None:
+                handler(event)
 
     def _check_bullet_alien_collisions(self):
         """响应子弹和外星人碰撞"""
-        # 删除发生碰撞的子弹和外星人
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens,
-                                                True, True)
+        # 删除发生碰撞的子弹和外星人, 得到每颗子弹消灭的外星人数量
+        if self.store is not None:
+            hit_counts = self.store.collide()
+        else:
+            collisions = self.collisions.groupcollide(self.bullets, self.aliens,
+                                                      True, True, self.aliens.origin)
+            hit_counts = [len(aliens) for aliens in collisions.values()]
         # bugfix: 被同一颗子弹消灭的所有外星人都计入得分
-        for _, aliens in collisions.items():
-            self.stats.score += self.settings.alien_points * len(aliens)
+        for count in hit_counts:
+            self.stats.score += self.settings.alien_points * count
             self.sb.prep_score()
             self.sb.check_high_score()
+        if hit_counts:
+            hits = sum(hit_counts)
+            self.stats.hits += hits
+            if self.telemetry is not None:
+                self.telemetry.emit('hit', level=self.stats.level, aliens=hits,
+                                    remaining=len(self.aliens), score=self.stats.score)
 
         # 如果外星人全被消灭
         if not self.aliens:
@@ -166,128 +324,281 @@ class AlienInvasion:
 
     def start_new_level(self):
         """外星人群被消灭干净时开始新等级"""
+        stats = self.stats
+        if self.telemetry is not None:
+            self.telemetry.emit('level_clear', level=stats.level, level_time=stats.level_time,
+                                shots=stats.shots, hits=stats.hits, score=stats.score,
+                                ships_left=stats.ships_left)
+
         # 删除现有的所有子弹, 并创建一个新的外星人群
-        self.bullets.empty()
+        self._clear_bullets()
         self._create_fleet()
 
         # 加快游戏节奏, 提升游戏难度
         self.settings.increase_speed()
 
         # 提高等级并更新等级图像
-        self.stats.level += 1
+        stats.level += 1
+        stats.reset_level_stats()
         self.sb.prep_level()
+        if self.telemetry is not None:
+            self._emit_level_start()
 
-    def _update_bullets(self) -> None:
+    def _emit_level_start(self) -> None:
+        """记录当前等级开始时的难度"""
+        settings = self.settings
+        self.telemetry.emit('level_start', level=self.stats.level, aliens=len(self.aliens),
+                            alien_speed=settings.alien_speed, bullet_speed=settings.bullet_speed,
+                            ship_speed=settings.ship_speed, alien_points=settings.alien_points)
+
+    def _update_bullets(self, dt: float) -> None:
         """更新子弹的位置并删除消失的子弹"""
-        # 更新子弹的位置
-        self.bullets.update()
+        if self.store is not None:
+            # 在数组中批量移动子弹并删除消失的子弹
+            self.store.update_bullets(dt)
+        else:
+            # 更新子弹的位置
+            self.bullets.update(dt)
 
-        # 删除消失的子弹
-        for bullet in self.bullets.copy():
-            if bullet.rect.bottom <= 0:
-                self.bullets.remove(bullet)
+            # 删除消失的子弹, 子弹离开编组后回到对象池
+            for bullet in self.bullets.sprites():
+                if bullet.rect.bottom <= 0:
+                    self.bullets.remove(bullet)
 
         self._check_bullet_alien_collisions()
 
     def _change_fleet_direction(self) -> None:
         """将整群外星人下移，并改变它们的方向"""
-        for alien in self.aliens:
-            alien.y += self.settings.fleet_drop_speed
-            alien.rect.y = alien.y
-        self.settings.fleet_direction *= -1
+        self.aliens.change_direction()
 
     def _check_fleet_edges(self) -> None:
         """有外星人到达边缘时采取相应措施"""
-        for alien in self.aliens:
-            if alien.check_edges():
-                self._change_fleet_direction()
-                break
+        if self.aliens.check_edges():
+            self._change_fleet_direction()
 
     def _ship_hit(self) -> None:
         """响应外星人被飞船撞到"""
+        if self.telemetry is not None:
+            stats = self.stats
+            self.telemetry.emit('ship_hit', level=stats.level, ships_left=stats.ships_left,
+                                level_time=stats.level_time, aliens=len(self.aliens),
+                                score=stats.score)
+
         if self.stats.ships_left > 0:
-            # 将ship_left减1并更新剩余飞船
+            # 将ship_left减1, 记分牌绘制时据此显示剩余飞船
             self.stats.ships_left -= 1
-            self.sb.prep_ships()
 
             # 清空余下的外星人和子弹
             self.aliens.empty()
-            self.bullets.empty()
+            self._clear_bullets()
 
             # 创建一群新的外星人，并将飞船放到屏幕底部中央
             self._create_fleet()
             self.ship.center_ship()
+            self.fire_control.reset()
 
-            # 暂停
-            sleep(1.5)
+            # 进入复活暂停, 期间继续处理事件和渲染
+            self.stats.state = GameState.RESPAWN
+            self.stats.respawn_time_left = self.settings.respawn_pause
         else:
-            self.stats.game_active = False
+            self.stats.state = GameState.GAME_OVER
+            self.stats.save_score()
+            if self.telemetry is not None:
+                self.telemetry.emit('game_over', level=self.stats.level,
+                                    score=self.stats.score)
             pygame.mouse.set_visible(True)
 
-    def _update_aliens(self) -> None:
+    def _update_aliens(self, dt: float) -> None:
         """检查是否有外星人位于屏幕边缘，并更新整群外星人的位置"""
+        if self.store is not None:
+            self._update_aliens_store(dt)
+            return
+
         self._check_fleet_edges()
-        self.aliens.update()
+        self.aliens.update(dt)
 
         # 检查是否有外星人撞到飞船
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        if self.collisions.spritecollideany(self.ship, self.aliens,
+                                            self.aliens.origin):
             self._ship_hit()
 
         # 检查是否有外星人到达了屏幕底端
-        for alien in self.aliens:
-            if alien.rect.bottom >= self.screen_rect.bottom:
-                self._ship_hit()  # 像飞船被撞到一样处理
-                break
+        if self.aliens.reached_bottom():
+            self._ship_hit()  # 像飞船被撞到一样处理
 
-    def _update_screen(self) -> None:
-        """更新屏幕上的图像，并切换到新屏幕"""
-        # 每次循环时都重绘屏幕
-        self.screen.fill(self.settings.bg_color)
+    def _update_aliens_store(self, dt: float) -> None:
+        """在数组实体存储中更新外星人群, 检查规则与精灵编组相同"""
+        # 精灵编组只记录位移, 使各行的外接矩形与存储中的位置一致
+        self.aliens.shift(*self.store.update_fleet(dt))
+
+        if self.store.collide_rect(self.ship.rect):
+            self._ship_hit()
+
+        if self.store.reached_bottom():
+            self._ship_hit()
+
+    def _update_screen(self, alpha: float = 1.0) -> None:
+        """更新屏幕上的图像，并切换到新屏幕
+
+        alpha为两个模拟步之间的插值系数, 使画面在渲染帧率与模拟频率不同时依然平滑
+        """
+        # 数组实体存储中的位置需要先同步到精灵
+        if self.store is not None:
+            self.store.sync_sprites()
+
+        # 擦除上一帧绘制的内容
+        renderer = self.renderer
+        renderer.begin_frame()
 
         # 绘制飞船和外星人
-        self.ship.blit_ship()
-        self.aliens.draw(self.screen)
+        self.ship.blit_ship(renderer, alpha)
+        if self.settings.fleet_rows:
+            # 跳过完全在屏幕外的行
+            screen_rect = self.screen_rect
+            for row in self.aliens.rows:
+                if row.bounds.colliderect(screen_rect):
+                    for alien in row:
+                        renderer.blit(alien.image, alien.interpolate(alpha))
+        else:
+            for alien in self.aliens:
+                renderer.blit(alien.image, alien.interpolate(alpha))
 
         # 在飞船和外星人后面重绘所有子弹
         for bullet in self.bullets:
-            bullet.draw_bullet()
+            bullet.draw_bullet(renderer, alpha)
 
-        # 显示得分和等级
-        self.sb.show_score()
+        # 显示得分和等级, 如果游戏处于活动状态, 同时显示余下的飞船
+        self.sb.show_score(renderer, self.stats.game_active)
 
-        if self.stats.game_active:
-            # 如果游戏处于活动状态, 显示余下的飞船
-            self.sb.ships.draw(self.screen)
-        else:
+        if self.stats.state is GameState.RESPAWN:
+            # 复活暂停期间显示倒计时
+            self.sb.show_countdown(renderer, self.stats.respawn_time_left)
+        elif not self.stats.game_active:
             # 如果游戏处于非活动状态, 就绘制Play按钮
-            self.play_button.draw_button()
-
-        # 让最近绘制的屏幕可见
-        pygame.display.flip()
+            self.play_button.draw_button(renderer)
+
+        if self.profiler_overlay is not None:
+            self.profiler_overlay.draw(renderer, self.loop.fps)
+
+        # 让最近绘制的区域可见
+        renderer.end_frame()
+
+    def _update_game(self, dt: float) -> None:
+        """将游戏模拟推进一个固定时间步长"""
+        if self.stats.state is GameState.PLAYING:
+            self.stats.level_time += dt
+            # 按住开火键时按射速连续开火
+            if self.fire_control.update(dt):
+                self._fire_bullet()
+            self.ship.update(dt)
+            self._update_bullets(dt)
+            self._update_aliens(dt)
+        elif self.stats.state is GameState.RESPAWN:
+            # 暂停计时由主循环的时钟驱动, 结束后继续游戏
+            self.stats.respawn_time_left -= dt
+            if self.stats.respawn_time_left <= 0:
+                self.stats.state = GameState.PLAYING
 
     def run_game(self) -> None:
         """开始游戏的主循环"""
         while True:
             self._check_events()
-
-            if self.stats.game_active:
-                self.ship.update()
-                self._update_bullets()
-                self._update_aliens()
-
-            self._update_screen()
+            # 按固定步长推进模拟, 再以插值后的位置渲染
+            self.loop.advance(self._update_game)
+            self._update_screen(self.loop.alpha)
+            if 'first_frame' not in self.startup_times:
+                self._report_startup()
+            if self.profiler is not None:
+                self.profiler.end_frame({'aliens': len(self.aliens),
+                                         'bullets': len(self.bullets)})
+            # 每隔一段时间发送帧时间汇总, 观察难度提高时帧时间的变化
+            telemetry = self.telemetry
+            if telemetry is not None and telemetry.add_frame(self.loop.frame_time,
+                                                             self.loop.tick_time):
+                telemetry.emit_frames(level=self.stats.level, state=self.stats.state.value,
+                                      aliens=len(self.aliens), bullets=len(self.bullets),
+                                      alien_speed=self.settings.alien_speed,
+                                      dropped_frames=self.loop.dropped_frames)
+
+    def _report_startup(self) -> None:
+        """记录绘制第一帧的时间, 启用性能分析时打印各启动阶段的耗时"""
+        self._mark_startup('first_frame')
+        if self.settings.profile:
+            print(', '.join(f'{stage} {seconds * 1000:.1f} ms'
+                            for stage, seconds in self.startup_times.items()))
+
+    def run_headless(self, max_ticks: Optional[int] = None,
+                     start: bool = True) -> GameStats:
+        """不渲染画面, 以最快速度模拟游戏直到达到max_ticks步
+
+        start为True时立即开始一局游戏并在游戏结束时停止; 为False时从菜单状态开始,
+        由输入源决定何时开始游戏(如回放录像), 只在达到max_ticks步时停止.
+        返回最终的游戏统计信息(得分、等级和剩余飞船)
+        """
+        if start:
+            self._start_game()
+        dt = 1.0 / self.settings.tick_rate
+        loop = self.loop
+        while max_ticks is None or loop.ticks < max_ticks:
+            if start and self.stats.state is GameState.GAME_OVER:
+                break
+            if self.store is not None:
+                # 输入源根据精灵的位置做决定
+                self.store.sync_sprites()
+            self._check_events()
+            self._update_game(dt)
+            loop.ticks += 1
+        return self.stats
 
     def exit_game(self):
-        """记录历史最高分并退出游戏"""
-        # 将最高分写入文件
-        filename = self.settings.high_score_file
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(str(self.stats.high_score))
-        # 游戏退出
+        """保存得分并退出游戏"""
+        # 保存本局得分, 等待后台线程写入数据库
+        if self.scores is not None:
+            self.stats.save_score()
+            self.scores.close()
+        # 写入剩余的遥测事件
+        if self.telemetry is not None:
+            self.telemetry.close()
+        # 导出性能分析数据
+        if self.profiler is not None and self.settings.profile_export:
+            self.profiler.export(self.settings.profile_export)
+        # 关闭输入源(如写入录像), 游戏退出
+        self.input_source.close(self)
+        self._quit()
+
+    def _quit(self) -> None:
+        """关闭pygame并结束进程"""
         pygame.quit()
         sys.exit()
 
 
 if __name__ == '__main__':
-    ai = AlienInvasion()
+    parser = argparse.ArgumentParser(description='外星人入侵')
+    parser.add_argument('--record', metavar='PATH', help='将玩家输入录制到文件, 可用replay.py回放')
+    parser.add_argument('--profile', action='store_true', help='记录各阶段耗时并显示性能叠加层')
+    parser.add_argument('--profile-export', metavar='PATH',
+                        help='退出时将耗时序列导出为CSV(或扩展名为.json时导出JSON)')
+    parser.add_argument('--config', metavar='PATH', help='TOML或JSON格式的设置文件')
+    parser.add_argument('--preset', choices=list(PRESETS), help='命名的设置预设')
+    parser.add_argument('--set', dest='overrides', action='append', default=[],
+                        type=parse_assignment, metavar='NAME=VALUE', help='覆盖单个设置项')
+    args = parser.parse_args()
+
+    try:
+        game_settings = Settings.load(args.config, args.preset,
+                                      {name: parse_value(value) for name, value in args.overrides})
+        # 按键名要在初始化pygame之后才能检查
+        pygame.init()
+        key_table(game_settings.key_bindings)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.profile or args.profile_export:
+        game_settings.profile = True
+        game_settings.profile_export = args.profile_export or ''
+
+    source = None
+    if args.record:
+        from replay import InputRecorder
+        source = InputRecorder(EventQueueInput(), args.record)
+    ai = AlienInvasion(game_settings, input_source=source)
     ai.run_game()
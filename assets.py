@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import pygame
+import pygame.font
+from pygame import Surface
+from pygame.font import Font
+
+from settings import resolve_path
+
+# 保存字体名解析结果的文件, 相对于游戏目录
+FONT_PATHS_FILE = 'font_cache.json'
+
+
+class AssetCache:
+    """按路径缓存图像资源的类, 每张图像只从磁盘加载一次"""
+
+    def __init__(self) -> None:
+        """初始化缓存和统计信息"""
+        self._images: Dict[str, Surface] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self, path: str) -> Surface:
+        """从磁盘加载图像, 并在显示模式已设置时转换为显示格式, 相对路径以游戏目录为基准"""
+        image = pygame.image.load(resolve_path(path))
+        if pygame.display.get_surface() is not None:
+            # 带透明通道的图像使用convert_alpha, 其余使用convert
+            if image.get_flags() & pygame.SRCALPHA:
+                image = image.convert_alpha()
+            else:
+                image = image.convert()
+        return image
+
+    def get(self, path: str) -> Surface:
+        """返回共享的图像, 缓存中没有时才加载
+
+        返回的Surface由所有调用者共享, 不应在其上直接绘制
+        """
+        image = self._images.get(path)
+        if image is None:
+            self.misses += 1
+            image = self._load(path)
+            self._images[path] = image
+        else:
+            self.hits += 1
+        return image
+
+    def preload(self, paths: Iterable[str]) -> None:
+        """预先加载一组图像, 预加载不计入命中统计"""
+        for path in paths:
+            if path not in self._images:
+                self.misses += 1
+                self._images[path] = self._load(path)
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """使指定图像失效, 未指定时清空整个缓存
+
+        显示模式改变后应清空缓存, 以便按新的显示格式重新转换
+        """
+        if path is None:
+            self._images.clear()
+        else:
+            self._images.pop(path, None)
+
+    @property
+    def bytes_resident(self) -> int:
+        """缓存中所有图像占用的像素内存字节数"""
+        return sum(image.get_pitch() * image.get_height()
+                   for image in self._images.values())
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存的查询统计信息"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'images': len(self._images),
+            'bytes_resident': self.bytes_resident,
+        }
+
+
+class FontCache:
+    """按字体名和字号共享字体对象的类
+
+    字体名解析出的字体文件保存在磁盘上, 下次启动时不再扫描系统字体;
+    字体名为空时使用pygame的默认字体, 无需解析
+    """
+
+    def __init__(self, path: str = FONT_PATHS_FILE) -> None:
+        """path为保存字体名解析结果的文件"""
+        self.path = resolve_path(path)
+        self._paths: Optional[Dict[str, str]] = None
+        self._fonts: Dict[Tuple[str, int], Font] = {}
+        # 字体可能在后台加载线程中创建
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _read_paths(self) -> Dict[str, str]:
+        """读取上次运行保存的解析结果, 文件不存在或已损坏时返回空表"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                paths = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return paths if isinstance(paths, dict) else {}
+
+    def _resolve(self, name: str) -> Optional[str]:
+        """返回字体名对应的字体文件, 找不到时返回None(使用默认字体)"""
+        if not name:
+            return None
+        if self._paths is None:
+            self._paths = self._read_paths()
+        path = self._paths.get(name)
+        if path and os.path.exists(path):
+            return path
+
+        # 缓存未命中时才扫描系统字体, 并保存结果供下次启动使用
+        path = pygame.font.match_font(name)
+        if path:
+            self._paths[name] = path
+            try:
+                with open(self.path, 'w', encoding='utf-8') as f:
+                    json.dump(self._paths, f, ensure_ascii=False, indent=2)
+            except OSError:
+                pass
+        return path
+
+    def get(self, name: str, size: int, count: bool = True) -> Font:
+        """返回共享的字体对象, 缓存中没有时才创建, count为False时不计入命中统计"""
+        with self._lock:
+            key = name, size
+            font = self._fonts.get(key)
+            if font is None:
+                if count:
+                    self.misses += 1
+                font = pygame.font.Font(self._resolve(name), size)
+                self._fonts[key] = font
+            elif count:
+                self.hits += 1
+            return font
+
+    def preload(self, name: str, sizes: Iterable[int]) -> None:
+        """预先创建一组字号的字体, 预加载不计入命中统计"""
+        for size in sizes:
+            self.get(name, size, count=False)
+
+
+# 游戏中所有精灵共享的图像缓存和字体缓存
+image_cache = AssetCache()
+font_cache = FontCache()
@@ -0,0 +1,93 @@
+from typing import Dict, List, Tuple
+
+import pygame
+from pygame import Rect, Surface
+
+
+def scale_image(image: Surface, scale: float) -> Surface:
+    """按比例缩放图像, 比例为1时原样返回"""
+    if scale == 1:
+        return image
+    size = max(1, round(image.get_width() * scale)), max(1, round(image.get_height() * scale))
+    return pygame.transform.smoothscale(image, size)
+
+
+class SpriteAtlas:
+    """将多幅小图像打包到一个显示格式Surface中的图集
+
+    打包后的每幅图像都是图集的子Surface, 与图集共享像素, 绘制时无需格式转换.
+    每幅图像的起始列都不对齐到4像素: 源和目标都按16字节对齐时, SDL以绕过缓存的
+    SSE流式写入复制像素, 对精灵这样的小图像反而比普通复制慢数倍
+    """
+
+    def __init__(self, max_width: int = 1024, padding: int = 1) -> None:
+        """max_width为图集的最大宽度, padding为相邻图像之间的最小间隔"""
+        self.max_width = max_width
+        self.padding = padding
+        self.surface = None
+        self.regions: Dict[str, Rect] = {}
+        self._images: Dict[str, Surface] = {}
+
+    @staticmethod
+    def _column(x: int) -> int:
+        """返回不小于x且除以4余1的列"""
+        return x + (1 - x) % 4
+
+    def _pack(self, images: Dict[str, Surface]) -> Tuple[int, int]:
+        """按高度从高到低逐行排列图像, 返回图集的尺寸"""
+        padding = self.padding
+        width = max([self.max_width] + [image.get_width() + 4 for image in images.values()])
+        order: List[str] = sorted(images, key=lambda name: -images[name].get_height())
+
+        self.regions = {}
+        x = self._column(0)
+        y = shelf_height = used_width = 0
+        for name in order:
+            image_width, image_height = images[name].get_size()
+            if x + image_width > width:
+                # 当前行放不下, 另起一行
+                x = self._column(0)
+                y += shelf_height + padding
+                shelf_height = 0
+            self.regions[name] = Rect(x, y, image_width, image_height)
+            used_width = max(used_width, x + image_width)
+            x = self._column(x + image_width + padding)
+            shelf_height = max(shelf_height, image_height)
+        return used_width, y + shelf_height
+
+    def build(self, images: Dict[str, Surface]) -> None:
+        """打包所有图像, 替换之前的图集"""
+        size = self._pack(images)
+        alpha = any(image.get_flags() & pygame.SRCALPHA for image in images.values())
+        surface = Surface(size, pygame.SRCALPHA if alpha else 0)
+        for name, image in images.items():
+            surface.blit(image, self.regions[name])
+
+        # 设置了显示模式时转换为显示格式
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if alpha else surface.convert()
+        self.surface = surface
+        self._images = {name: surface.subsurface(rect) for name, rect in self.regions.items()}
+
+    def get(self, name: str) -> Surface:
+        """返回图集中的图像, 返回的Surface与图集共享像素, 不应在其上直接绘制"""
+        return self._images[name]
+
+    def __contains__(self, name: str) -> bool:
+        """图集中是否有该图像"""
+        return name in self._images
+
+    def stats(self) -> Dict[str, int]:
+        """返回图集的尺寸和占用的像素内存"""
+        if self.surface is None:
+            return {'images': 0, 'width': 0, 'height': 0, 'bytes_resident': 0}
+        return {
+            'images': len(self._images),
+            'width': self.surface.get_width(),
+            'height': self.surface.get_height(),
+            'bytes_resident': self.surface.get_pitch() * self.surface.get_height(),
+        }
+
+
+# 游戏中所有精灵共享的图集
+sprite_atlas = SpriteAtlas()
@@ -0,0 +1,166 @@
+"""并行运行多局无窗口游戏, 统计不同设置下的得分和等级分布
+
+用法示例:
+    python batch_runner.py --games 200 --sweep speed_scale=1.05,1.1,1.2
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from settings import PRESETS, Settings, parse_assignment, parse_value, resolve_config
+
+Overrides = Dict[str, Any]
+Job = Tuple[int, Overrides, Overrides, Optional[int]]
+
+
+def run_game(job: Job) -> Dict[str, Any]:
+    """在当前进程中运行一局无窗口游戏, 返回该局的结果"""
+    seed, config, overrides, max_ticks = job
+
+    # 在子进程中导入pygame, 避免主进程初始化显示模块
+    from alien_invasion import AlienInvasion
+    from input_source import BotInput
+
+    settings = Settings()
+    settings.update(config)
+    settings.update(overrides)
+    game = AlienInvasion(settings, headless=True, input_source=BotInput(seed))
+
+    start = time.perf_counter()
+    stats = game.run_headless(max_ticks)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'seed': seed,
+        'overrides': overrides,
+        'score': stats.score,
+        'level': stats.level,
+        'ships_left': stats.ships_left,
+        'ticks': game.loop.ticks,
+        'seconds': elapsed,
+    }
+
+
+def check_key_bindings(bindings: Dict[str, Any]) -> None:
+    """在子进程中初始化pygame后检查按键名, 按键名不存在或重复绑定时引发ValueError"""
+    import pygame
+    from controls import key_table
+
+    pygame.init()
+    key_table(bindings)
+
+
+def build_jobs(games: int, seed: int, config: Overrides, base: Overrides,
+               sweep: Dict[str, List[Any]], max_ticks: Optional[int]) -> List[Job]:
+    """为扫描的每种设置组合生成games局游戏的任务, config为预设和设置文件中的值"""
+    names = list(sweep)
+    jobs = []
+    for values in itertools.product(*(sweep[name] for name in names)):
+        overrides = dict(base)
+        overrides.update(zip(names, values))
+        for index in range(games):
+            jobs.append((seed + index, config, overrides, max_ticks))
+    return jobs
+
+
+def summarize(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """按设置组合汇总得分、等级分布和模拟吞吐量"""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for result in results:
+        key = json.dumps(result['overrides'], sort_keys=True)
+        groups.setdefault(key, []).append(result)
+
+    summaries = []
+    for key, group in groups.items():
+        scores = [result['score'] for result in group]
+        levels = [result['level'] for result in group]
+        ticks = sum(result['ticks'] for result in group)
+        seconds = sum(result['seconds'] for result in group)
+        summaries.append({
+            'overrides': json.loads(key),
+            'games': len(group),
+            'score_mean': statistics.mean(scores),
+            'score_median': statistics.median(scores),
+            'score_min': min(scores),
+            'score_max': max(scores),
+            'level_mean': statistics.mean(levels),
+            'levels': dict(sorted(Counter(levels).items())),
+            'ticks_per_second': ticks / seconds if seconds else 0.0,
+        })
+    return summaries
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='并行运行无窗口的《外星人入侵》对局')
+    parser.add_argument('--games', type=int, default=20, help='每种设置组合运行的局数')
+    parser.add_argument('--seed', type=int, default=0, help='第一局的随机种子')
+    parser.add_argument('--workers', type=int, default=None, help='进程数, 默认为CPU核数')
+    parser.add_argument('--max-ticks', type=int, default=None, help='每局最多模拟的步数')
+    parser.add_argument('--config', metavar='PATH', help='TOML或JSON格式的设置文件')
+    parser.add_argument('--preset', choices=list(PRESETS), help='命名的设置预设')
+    parser.add_argument('--set', dest='base', action='append', default=[],
+                        type=parse_assignment, metavar='NAME=VALUE',
+                        help='所有对局共用的设置覆盖值')
+    parser.add_argument('--sweep', action='append', default=[],
+                        type=parse_assignment, metavar='NAME=V1,V2,...',
+                        help='逐一尝试的设置值(速度和分数请使用initial_*设置项)')
+    parser.add_argument('--json', dest='json_path', help='将逐局结果和汇总写入JSON文件')
+    args = parser.parse_args(argv)
+
+    base = {name: parse_value(value) for name, value in args.base}
+    sweep = {name: [parse_value(item) for item in value.split(',')]
+             for name, value in args.sweep}
+    bindings = {}
+    try:
+        config = resolve_config(args.config, args.preset)
+        # 在启动子进程之前校验所有设置组合
+        for _, job_config, overrides, _ in build_jobs(1, args.seed, config, base, sweep, None):
+            settings = Settings()
+            settings.update({**job_config, **overrides})
+            bindings[json.dumps(settings.key_bindings, sort_keys=True)] = settings.key_bindings
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    jobs = build_jobs(args.games, args.seed, config, base, sweep, args.max_ticks)
+
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        # 按键名要在初始化pygame之后才能检查, 主进程不导入pygame, 因此交给子进程
+        try:
+            for checked in bindings.values():
+                executor.submit(check_key_bindings, checked).result()
+        except ValueError as e:
+            parser.error(str(e))
+
+        start = time.perf_counter()
+        results = list(executor.map(run_game, jobs))
+        elapsed = time.perf_counter() - start
+
+    summaries = summarize(results)
+    total_ticks = sum(result['ticks'] for result in results)
+    # 预设和设置文件中的值由所有对局共用, 各组合只列出--set和--sweep的覆盖值
+    print(f"基础设置: {config or '默认设置'}")
+    for summary in summaries:
+        print(f"{summary['overrides'] or '无覆盖值'}: {summary['games']}局, "
+              f"得分均值{summary['score_mean']:,.0f} 中位数{summary['score_median']:,.0f} "
+              f"范围[{summary['score_min']:,}, {summary['score_max']:,}], "
+              f"等级均值{summary['level_mean']:.2f} 分布{summary['levels']}, "
+              f"单进程{summary['ticks_per_second']:,.0f}步/秒")
+    print(f'共{len(results)}局, 耗时{elapsed:.2f}秒, 总吞吐量{total_ticks / elapsed:,.0f}步/秒')
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'config': config, 'results': results, 'summaries': summaries}, f,
+                      ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
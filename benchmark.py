@@ -0,0 +1,394 @@
+"""模拟和渲染热点路径的基准测试
+
+用法示例:
+    python benchmark.py                              # 运行所有场景
+    python benchmark.py --save-baseline bench.json   # 保存为基线
+    python benchmark.py --baseline bench.json        # 与基线比较, 出现退化时返回1
+    python benchmark.py tick_flat tick_rows          # 外星人群不分行与按行分组的每步耗时
+    python benchmark.py --memory                     # 每个外星人和子弹占用的内存, 与普通Sprite比较
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame  # noqa: E402
+
+from alien_invasion import AlienInvasion  # noqa: E402
+from assets import image_cache  # noqa: E402
+from atlas import sprite_atlas  # noqa: E402
+from bullet import BulletPool  # noqa: E402
+from fleet import Fleet  # noqa: E402
+from formation import formation_cache  # noqa: E402
+from game_stats import GameState  # noqa: E402
+from settings import Settings, resolve_path  # noqa: E402
+
+SCREEN_SIZES = [(1200, 800), (2400, 1600), (4800, 3200)]
+FORMATIONS = ['grid', 'wedge']
+
+Scenario = Callable[[AlienInvasion], Callable[[], None]]
+
+
+def make_game(screen_size: Tuple[int, int], formation: str, **overrides) -> AlienInvasion:
+    """创建一局处于游戏状态的游戏, 使用dummy视频驱动"""
+    settings = Settings()
+    settings.update({'screen_width': screen_size[0], 'screen_height': screen_size[1],
+                     'formation': formation, 'score_db': '', **overrides})
+    game = AlienInvasion(settings)
+    game._start_game()
+    return game
+
+
+def create_fleet(game: AlienInvasion) -> Callable[[], None]:
+    """_create_fleet: 重新生成整群外星人"""
+    return game._create_fleet
+
+
+def update_aliens(game: AlienInvasion) -> Callable[[], None]:
+    """_update_aliens: 整群外星人的一个模拟步"""
+    dt = 1.0 / game.settings.tick_rate
+
+    def tick() -> None:
+        # 外星人群接近底部时重新生成, 使每次测量的外星人数量相同
+        if game.stats.state is not GameState.PLAYING or game.aliens.reached_bottom():
+            game.stats.state = GameState.PLAYING
+            game.stats.ships_left = game.settings.ship_limit
+            game._create_fleet()
+        game._update_aliens(dt)
+
+    return tick
+
+
+def bullet_collisions(game: AlienInvasion) -> Callable[[], None]:
+    """_check_bullet_alien_collisions: 子弹数量达到上限且每颗子弹都击中外星人时的碰撞检测"""
+    def collide() -> None:
+        # 剩余的外星人不够子弹击中时重新生成, 不让外星人全被消灭而进入下一等级
+        if len(game.aliens) <= game.bullets.capacity:
+            game._create_fleet()
+        # 重新装填子弹, 放到均匀分布的外星人的中心
+        game._clear_bullets()
+        aliens = game.aliens.sprites()
+        count = min(game.bullets.capacity, len(aliens) - 1)
+        for number in range(count):
+            bullet = game.bullets.fire()
+            bullet.rect.center = aliens[number * len(aliens) // count].rect.center
+            bullet.y = bullet.prev_y = float(bullet.rect.y)
+            if game.store is not None:
+                game.store.add_bullet(bullet)
+        game._check_bullet_alien_collisions()
+
+    return collide
+
+
+def update_screen(game: AlienInvasion) -> Callable[[], None]:
+    """_update_screen: 外星人群移动时的一帧(脏矩形模式)"""
+    dt = 1.0 / game.settings.tick_rate
+
+    def frame() -> None:
+        game.aliens.update(dt)
+        game._update_screen(0.5)
+
+    return frame
+
+
+def update_screen_full(game: AlienInvasion) -> Callable[[], None]:
+    """_update_screen: 外星人群移动时的一帧(每帧完整重绘)"""
+    game.renderer.dirty_rects = False
+    return update_screen(game)
+
+
+def _blit_fleet(game: AlienInvasion, image: pygame.Surface) -> Callable[[], None]:
+    """在每个外星人的位置绘制image"""
+    screen = game.screen
+    positions = [alien.rect.topleft for alien in game.aliens]
+
+    def blit() -> None:
+        for position in positions:
+            screen.blit(image, position)
+
+    return blit
+
+
+def blit_unconverted(game: AlienInvasion) -> Callable[[], None]:
+    """绘制整群外星人, 图像未转换为显示格式, 每次绘制都要转换像素格式"""
+    return _blit_fleet(game, pygame.image.load(resolve_path(game.settings.alien_image)))
+
+
+def blit_converted(game: AlienInvasion) -> Callable[[], None]:
+    """绘制整群外星人, 图像单独转换为显示格式"""
+    return _blit_fleet(game, image_cache.get(game.settings.alien_image))
+
+
+def blit_atlas(game: AlienInvasion) -> Callable[[], None]:
+    """绘制整群外星人, 图像取自显示格式的图集"""
+    return _blit_fleet(game, sprite_atlas.get('alien'))
+
+
+def _game_tick(game: AlienInvasion, fleet_rows: bool) -> Callable[[], None]:
+    """完整的一个模拟步加一帧绘制, 子弹数量保持在上限"""
+    game.settings.fleet_rows = fleet_rows
+    game.collisions.use_rows = fleet_rows
+    game._create_fleet()
+    fleet_size = len(game.aliens)
+    dt = 1.0 / game.settings.tick_rate
+
+    def tick() -> None:
+        # 外星人被消灭过半或接近底部时重新生成, 使外星人数量大致不变
+        if (game.stats.state is not GameState.PLAYING or game.aliens.reached_bottom()
+                or len(game.aliens) < fleet_size // 2):
+            game.stats.state = GameState.PLAYING
+            game.stats.ships_left = game.settings.ship_limit
+            game._create_fleet()
+        while game.bullets.fire() is not None:
+            pass
+        game._update_game(dt)
+        game._update_screen(0.5)
+
+    return tick
+
+
+def tick_flat(game: AlienInvasion) -> Callable[[], None]:
+    """一个模拟步加一帧绘制, 外星人群不分行, 碰撞检测使用空间哈希网格"""
+    return _game_tick(game, False)
+
+
+def tick_rows(game: AlienInvasion) -> Callable[[], None]:
+    """一个模拟步加一帧绘制, 外星人群按行分组, 碰撞检测和绘制跳过整行"""
+    return _game_tick(game, True)
+
+
+def prep_images(game: AlienInvasion) -> Callable[[], None]:
+    """Scoreboard.prep_images: 得分改变后重新准备记分牌图像"""
+    def prep() -> None:
+        game.stats.score += 50
+        game.sb.prep_images()
+        game.sb.flush()
+
+    return prep
+
+
+def startup(game: AlienInvasion) -> Callable[[], None]:
+    """从创建游戏到绘制第一帧的启动时间"""
+    def start() -> None:
+        started = AlienInvasion(game.settings)
+        started._update_screen()
+        started._report_startup()
+
+    return start
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    'create_fleet': create_fleet,
+    'update_aliens': update_aliens,
+    'bullet_collisions': bullet_collisions,
+    'update_screen': update_screen,
+    'update_screen_full': update_screen_full,
+    'blit_unconverted': blit_unconverted,
+    'blit_converted': blit_converted,
+    'blit_atlas': blit_atlas,
+    'tick_flat': tick_flat,
+    'tick_rows': tick_rows,
+    'prep_images': prep_images,
+    'startup': startup,
+}
+
+
+def measure(func: Callable[[], None], min_time: float) -> Tuple[float, int]:
+    """重复调用func至少min_time秒, 返回每秒调用次数和内存峰值(字节)"""
+    func()  # 预热
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        func()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+    rate = iterations / elapsed
+
+    # 单独测量内存峰值, 避免tracemalloc的开销影响计时
+    tracemalloc.start()
+    for _ in range(min(iterations, 20)):
+        func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rate, peak
+
+
+def run(names: List[str], screen_sizes: List[Tuple[int, int]], formations: List[str],
+        min_time: float, **overrides) -> Dict[str, Dict[str, float]]:
+    """运行所有场景组合, 返回以场景标识为键的结果"""
+    results = {}
+    for name in names:
+        for screen_size in screen_sizes:
+            for formation in formations:
+                game = make_game(screen_size, formation, **overrides)
+                func = SCENARIOS[name](game)
+                rate, peak = measure(func, min_time)
+                key = f'{name}[{screen_size[0]}x{screen_size[1]}-{formation}]'
+                results[key] = {'aliens': len(game.aliens), 'per_second': rate,
+                                'peak_bytes': peak}
+                print(f'{key:<48} {len(game.aliens):>6}个外星人 '
+                      f'{rate:>12,.1f}次/秒 内存峰值{peak / 1024:>10,.1f} KiB')
+    return results
+
+
+class PlainAlien(pygame.sprite.Sprite):
+    """内存基线: 普通Sprite子类, 每个实例各自保存屏幕、设置、图像、矩形和位置"""
+
+    def __init__(self, screen: pygame.Surface, settings: Settings, x: float, y: float) -> None:
+        super(PlainAlien, self).__init__()
+        self.screen = screen
+        self.settings = settings
+        self.image = sprite_atlas.get('alien')
+        self.rect = self.image.get_rect(topleft=(x, y))
+        self.x = self.prev_x = float(x)
+        self.y = self.prev_y = float(y)
+
+
+class PlainBullet(pygame.sprite.Sprite):
+    """内存基线: 普通Sprite子类, 每个实例各自保存屏幕、设置、图像、矩形和位置"""
+
+    def __init__(self, screen: pygame.Surface, settings: Settings,
+                 midtop: Tuple[int, int]) -> None:
+        super(PlainBullet, self).__init__()
+        self.screen = screen
+        self.settings = settings
+        self.image = sprite_atlas.get('bullet')
+        self.rect = self.image.get_rect(midtop=midtop)
+        self.y = self.prev_y = float(self.rect.y)
+
+
+def _allocated(create: Callable[[], object]) -> int:
+    """返回create()创建的对象仍然占用的内存(字节), 由tracemalloc快照的差值得到"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    created = create()  # noqa: F841 保持对象存活直到第二次快照
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    return sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+
+
+def memory_report(screen_sizes: List[Tuple[int, int]],
+                  formations: List[str]) -> Dict[str, Dict[str, float]]:
+    """统计每种外星人群规模下每个外星人和每颗子弹占用的内存
+
+    基线为放在普通Group中的普通Sprite子类(PlainAlien, PlainBullet), 与游戏使用的
+    紧凑精灵(放在Fleet和BulletPool中)比较
+    """
+    results = {}
+    for screen_size in screen_sizes:
+        for formation in formations:
+            game = make_game(screen_size, formation)
+            settings = game.settings
+            layout = formation_cache.get(formation, game.screen_rect.size,
+                                         sprite_atlas.get('alien').get_size(),
+                                         game.ship.rect.height)
+            count = len(layout)
+
+            def create_fleet() -> Fleet:
+                fleet = Fleet(game.screen, settings)
+                fleet.respawn(layout)
+                return fleet
+
+            def create_bullets() -> BulletPool:
+                # 子弹数量与外星人数量相同, 便于比较
+                settings.bullet_limit = count
+                return BulletPool(game.screen, settings, game.ship)
+
+            def create_plain_aliens() -> pygame.sprite.Group:
+                return pygame.sprite.Group(PlainAlien(game.screen, settings, x, y)
+                                           for x, y in layout)
+
+            def create_plain_bullets() -> pygame.sprite.Group:
+                midtop = game.ship.rect.midtop
+                return pygame.sprite.Group(PlainBullet(game.screen, settings, midtop)
+                                           for _ in range(count))
+
+            plain_alien_bytes = _allocated(create_plain_aliens) / count
+            plain_bullet_bytes = _allocated(create_plain_bullets) / count
+            alien_bytes = _allocated(create_fleet) / count
+            bullet_bytes = _allocated(create_bullets) / count
+            key = f'memory[{screen_size[0]}x{screen_size[1]}-{formation}]'
+            results[key] = {'aliens': count,
+                            'plain_alien_bytes': plain_alien_bytes, 'alien_bytes': alien_bytes,
+                            'plain_bullet_bytes': plain_bullet_bytes,
+                            'bullet_bytes': bullet_bytes}
+            print(f'{key:<48} {count:>6}个实体 '
+                  f'每个外星人{plain_alien_bytes:>8,.1f} -> {alien_bytes:>8,.1f}字节 '
+                  f'每颗子弹{plain_bullet_bytes:>8,.1f} -> {bullet_bytes:>8,.1f}字节')
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """与基线比较, 返回吞吐量下降超过threshold的场景"""
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        before = baseline[key]['per_second']
+        change = result['per_second'] / before - 1
+        flag = '  <-- 退化' if change < -threshold else ''
+        print(f'{key:<48} {before:>12,.1f} -> {result["per_second"]:>12,.1f} '
+              f'({change:+.1%}){flag}')
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """解析WIDTHxHEIGHT形式的屏幕尺寸"""
+    width, _, height = text.partition('x')
+    return int(width), int(height)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='《外星人入侵》热点路径基准测试')
+    parser.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help=f'要运行的场景, 默认运行全部: {", ".join(SCENARIOS)}')
+    parser.add_argument('--size', dest='sizes', action='append', type=parse_size,
+                        help='屏幕尺寸WIDTHxHEIGHT, 可重复指定')
+    parser.add_argument('--formation', dest='formations', action='append',
+                        help='外星人群阵型(决定外星人密度), 可重复指定')
+    parser.add_argument('--min-time', type=float, default=0.5, help='每个场景至少运行的秒数')
+    parser.add_argument('--entity-store', action='store_true', help='使用NumPy数组实体存储')
+    parser.add_argument('--memory', action='store_true',
+                        help='只统计每个外星人和子弹占用的内存, 不运行场景')
+    parser.add_argument('--save-baseline', metavar='PATH', help='将结果保存为基线')
+    parser.add_argument('--baseline', metavar='PATH', help='与基线比较')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='吞吐量下降超过该比例视为退化')
+    args = parser.parse_args(argv)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f'未知的场景: {name}')
+
+    if args.memory:
+        memory_report(args.sizes or SCREEN_SIZES, args.formations or FORMATIONS)
+        return
+
+    results = run(args.scenarios or list(SCENARIOS), args.sizes or SCREEN_SIZES,
+                  args.formations or FORMATIONS, args.min_time,
+                  entity_store=args.entity_store)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
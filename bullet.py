@@ -1,36 +1,108 @@
-import pygame
+from typing import Dict, List, Optional
+
 from pygame import Surface
-from pygame.sprite import Sprite
+from pygame.sprite import Group
 
+from atlas import sprite_atlas
+from compact_sprite import CompactSprite
+from renderer import Renderer
 from settings import Settings
 from ship import Ship
 
 
-class Bullet(Sprite):
-    """管理飞船所发射子弹的类"""
+class Bullet(CompactSprite):
+    """管理飞船所发射子弹的类
 
-    def __init__(self, screen: Surface, settings: Settings, ship: Ship) -> None:
+    屏幕、设置和图像由所有子弹共享, 保存在类属性中, 由share()设置
+    """
+
+    # pygame的Sprite没有定义__slots__, 子弹实例依然有__dict__; 这里的__slots__只限定子弹
+    # 自身的属性, 在Python 3.11上每颗子弹节省的内存不超过8字节
+    __slots__ = ('rect', 'y', 'prev_y')
+
+    # 所有子弹共享的屏幕、设置和图像(图集中的纯色矩形)
+    screen: Surface = None
+    settings: Settings = None
+    image: Surface = None
+
+    @classmethod
+    def share(cls, screen: Surface, settings: Settings) -> None:
+        """设置所有子弹共享的屏幕、设置和图像, 须在构建图集后、创建子弹前调用"""
+        cls.screen = screen
+        cls.settings = settings
+        cls.image = sprite_atlas.get('bullet')
+
+    def __init__(self, ship: Ship) -> None:
         """在飞船当前位置创建一个子弹对象"""
         super(Bullet, self).__init__()
-        self.screen = screen
-        self.settings = settings
-        self.color = self.settings.bullet_color
+        # 在(0, 0)处创建表示子弹的矩形，再设置正确的位置
+        self.rect = self.image.get_rect()
+        self.reset(ship)
 
-        # 在(0, 0)处创建一个表示子弹的矩形，再设置正确的位置
-        self.rect = pygame.Rect(
-            0, 0, self.settings.bullet_width, self.settings.bullet_height)
+    def reset(self, ship: Ship) -> None:
+        """将子弹放到飞船当前位置, 子弹被对象池重复使用时调用"""
         self.rect.midtop = ship.rect.midtop
 
         # 存储用小数表示的子弹位置
         self.y = float(self.rect.y)
+        # 上一模拟步结束时的位置, 用于渲染插值
+        self.prev_y = self.y
 
-    def update(self) -> None:
-        """向上移动子弹"""
+    def update(self, dt: float) -> None:
+        """向上移动子弹, dt为模拟步长(秒)"""
         # 更新表示子弹位置的小数值
-        self.y -= self.settings.bullet_speed
+        self.prev_y = self.y
+        self.y -= self.settings.bullet_speed * dt
         # 更新表示子弹的rect的位置
         self.rect.y = self.y
 
-    def draw_bullet(self) -> None:
-        """在屏幕上绘制子弹"""
-        pygame.draw.rect(self.screen, self.color, self.rect)
+    def draw_bullet(self, renderer: Renderer, alpha: float = 1.0) -> None:
+        """在插值后的位置绘制子弹"""
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        renderer.blit(self.image, (self.rect.x, y))
+
+
+class BulletPool(Group):
+    """固定容量的子弹对象池, 编组中的成员即为飞行中的子弹
+
+    容量取自Settings.bullet_limit, 所有子弹在创建对象池时一次性分配;
+    子弹离开编组(kill、remove或empty)时自动回到空闲列表, 供下次发射重复使用
+    """
+
+    def __init__(self, screen: Surface, settings: Settings, ship: Ship) -> None:
+        """预先分配所有子弹"""
+        super(BulletPool, self).__init__()
+        self.ship = ship
+        self.capacity = settings.bullet_limit
+        Bullet.share(screen, settings)
+        self._free: List[Bullet] = [Bullet(ship) for _ in range(self.capacity)]
+
+        # 从对象池取得子弹的次数, 以及因子弹全部在飞行中而发射失败的次数
+        self.hits = 0
+        self.exhausted = 0
+
+    def fire(self) -> Optional[Bullet]:
+        """从飞船当前位置发射一颗子弹, 没有空闲子弹时返回None"""
+        if not self._free:
+            self.exhausted += 1
+            return None
+        bullet = self._free.pop()
+        bullet.reset(self.ship)
+        self.add(bullet)
+        self.hits += 1
+        return bullet
+
+    def remove_internal(self, sprite: Bullet) -> None:
+        """子弹离开编组时回到空闲列表"""
+        super(BulletPool, self).remove_internal(sprite)
+        self._free.append(sprite)
+
+    def stats(self) -> Dict[str, int]:
+        """返回对象池的统计信息"""
+        return {
+            'capacity': self.capacity,
+            'active': len(self),
+            'free': len(self._free),
+            'hits': self.hits,
+            'exhausted': self.exhausted,
+        }
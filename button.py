@@ -1,18 +1,21 @@
-import pygame.font
+import pygame
 from pygame import Surface
 
+from assets import font_cache
+from renderer import Renderer
+
 
 class Button:
 
-    def __init__(self, screen: Surface, msg: str) -> None:
-        """初始化按钮的属性"""
+    def __init__(self, screen: Surface, msg: str, font_name: str = '') -> None:
+        """初始化按钮的属性, font_name为空时使用默认字体"""
         self.screen = screen
 
         # 设置按钮的尺寸和其它属性
         self.width, self.height = 200, 50
         self.button_color = (0, 255, 0)
         self.text_color = (255, 255, 255)
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = font_cache.get(font_name, 48)
 
         # 创建按钮的rect对象，并使其居中
         self.rect = pygame.Rect(0, 0, self.width, self.height)
@@ -28,7 +31,7 @@ class Button:
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
-    def draw_button(self) -> None:
+    def draw_button(self, renderer: Renderer) -> None:
         """绘制一个用颜色填充的按钮，再绘制文本"""
-        self.screen.fill(self.button_color, self.rect)
-        self.screen.blit(self.msg_image, self.msg_image_rect)
+        renderer.fill(self.button_color, self.rect)
+        renderer.blit(self.msg_image, self.msg_image_rect)
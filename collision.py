@@ -0,0 +1,120 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pygame
+from pygame import Rect
+from pygame.sprite import Group, Sprite
+
+Cell = Tuple[int, int]
+Origin = Tuple[float, float]
+
+
+class SpatialHash:
+    """按矩形所在的网格单元索引精灵的均匀网格"""
+
+    def __init__(self, cell_size: int) -> None:
+        """初始化网格, cell_size为单元格边长(像素)"""
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, List[Sprite]] = {}
+
+    def _cell_range(self, rect: Rect) -> Tuple[int, int, int, int]:
+        """返回矩形覆盖的单元格范围(左, 上, 右, 下), 均包含在内"""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def build(self, sprites: Iterable[Sprite]) -> None:
+        """清空网格并插入所有精灵"""
+        self.cells = {}
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def insert(self, sprite: Sprite) -> None:
+        """将精灵插入其rect覆盖的所有单元格"""
+        left, top, right, bottom = self._cell_range(sprite.rect)
+        cells = self.cells
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                cells.setdefault((cx, cy), []).append(sprite)
+
+    def query(self, rect: Rect) -> List[Sprite]:
+        """返回与矩形所在单元格相同的精灵(宽相位候选), 保持插入顺序且不重复"""
+        left, top, right, bottom = self._cell_range(rect)
+        cells = self.cells
+        candidates: Dict[Sprite, None] = {}
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    candidates.update(dict.fromkeys(cell))
+        return list(candidates)
+
+
+class CollisionEngine:
+    """检测子弹与外星人、外星人与飞船之间碰撞的类
+
+    use_grid为True时使用空间哈希做宽相位检测, 否则退回pygame的逐对检测,
+    两种方式的结果相同, 后者可用于验证
+
+    目标整体平移时(如外星人群)无需重建网格: 调用方传入目标的当前原点,
+    查询矩形按建立索引以来的位移反向平移后再查找网格
+
+    use_grid和use_rows都为True时不使用网格, 由目标编组的candidates(rect)方法
+    (如Fleet按行筛选)提供候选; use_grid为False时总是逐对检测, 忽略use_rows
+    """
+
+    def __init__(self, cell_size: int, use_grid: bool = True, use_rows: bool = False) -> None:
+        """初始化碰撞引擎"""
+        self.use_grid = use_grid
+        self.use_rows = use_rows
+        self.grid = SpatialHash(cell_size)
+        # 建立索引时目标的原点
+        self._origin = 0.0, 0.0
+
+    def rebuild(self, targets: Group, origin: Origin = (0.0, 0.0)) -> None:
+        """按目标编组的当前位置建立网格, 目标重新创建后调用"""
+        if self.use_grid and not self.use_rows:
+            self.grid.build(targets)
+            self._origin = origin
+
+    def _candidates(self, rect: Rect, targets: Group, origin: Origin) -> List[Sprite]:
+        """返回可能与矩形碰撞的目标"""
+        if self.use_rows:
+            return targets.candidates(rect)
+        dx = round(origin[0] - self._origin[0])
+        dy = round(origin[1] - self._origin[1])
+        # 目标的rect由小数位置取整得到, 平移量可能相差1像素, 因此略微扩大查询范围
+        return self.grid.query(rect.move(-dx, -dy).inflate(4, 4))
+
+    def groupcollide(self, group: Group, targets: Group, dokill: bool,
+                     dokill_targets: bool,
+                     origin: Origin = (0.0, 0.0)) -> Dict[Sprite, List[Sprite]]:
+        """与pygame.sprite.groupcollide语义相同, targets须已调用rebuild建立索引"""
+        if not self.use_grid:
+            return pygame.sprite.groupcollide(group, targets, dokill, dokill_targets)
+
+        crashed = {}
+        for sprite in group.sprites():
+            rect = sprite.rect
+            # 已被之前的子弹消灭的目标不再参与碰撞
+            hits = [target for target in self._candidates(rect, targets, origin)
+                    if target.alive() and rect.colliderect(target.rect)]
+            if hits:
+                if dokill_targets:
+                    for target in hits:
+                        target.kill()
+                if dokill:
+                    sprite.kill()
+                crashed[sprite] = hits
+        return crashed
+
+    def spritecollideany(self, sprite: Sprite, targets: Group,
+                         origin: Origin = (0.0, 0.0)) -> Optional[Sprite]:
+        """与pygame.sprite.spritecollideany语义相同, targets须已调用rebuild建立索引"""
+        if not self.use_grid:
+            return pygame.sprite.spritecollideany(sprite, targets)
+
+        rect = sprite.rect
+        for target in self._candidates(rect, targets, origin):
+            if target.alive() and rect.colliderect(target.rect):
+                return target
+        return None
@@ -0,0 +1,70 @@
+from typing import List, Tuple
+
+from pygame.sprite import AbstractGroup, Sprite
+
+
+class CompactSprite(Sprite):
+    """用元组记录所属编组的精灵基类, 供数量很多的外星人和子弹使用
+
+    pygame的Sprite为每个实例创建一个集合记录所属编组, 即使为空也占用216字节;
+    游戏中的精灵最多同时属于两个编组, 用元组保存即可, 每个精灵节省约216字节.
+
+    Sprite没有定义__slots__, 因此本类和子类的实例依然有__dict__; 在Python 3.11上
+    实例属性保存在预先分配的共享键值数组中, 子类定义__slots__几乎不节省内存
+    """
+
+    __slots__ = ('_groups',)
+
+    def __init__(self, *groups: AbstractGroup) -> None:
+        """初始化精灵并将其加入groups"""
+        self._groups: Tuple[AbstractGroup, ...] = ()
+        if groups:
+            self.add(*groups)
+
+    def add(self, *groups) -> None:
+        """将精灵加入编组, 参数也可以是编组的序列"""
+        for group in groups:
+            if hasattr(group, '_spritegroup'):
+                if group not in self._groups:
+                    group.add_internal(self)
+                    self.add_internal(group)
+            else:
+                self.add(*group)
+
+    def remove(self, *groups) -> None:
+        """将精灵从编组中删除, 参数也可以是编组的序列"""
+        for group in groups:
+            if hasattr(group, '_spritegroup'):
+                if group in self._groups:
+                    group.remove_internal(self)
+                    self.remove_internal(group)
+            else:
+                self.remove(*group)
+
+    def add_internal(self, group: AbstractGroup) -> None:
+        """记录精灵已加入编组"""
+        self._groups += (group,)
+
+    def remove_internal(self, group: AbstractGroup) -> None:
+        """记录精灵已离开编组"""
+        groups = self._groups
+        index = groups.index(group)
+        self._groups = groups[:index] + groups[index + 1:]
+
+    def kill(self) -> None:
+        """将精灵从所有编组中删除"""
+        for group in self._groups:
+            group.remove_internal(self)
+        self._groups = ()
+
+    def groups(self) -> List[AbstractGroup]:
+        """返回精灵所属的编组"""
+        return list(self._groups)
+
+    def alive(self) -> bool:
+        """精灵是否属于任何编组"""
+        return bool(self._groups)
+
+    def __repr__(self) -> str:
+        """与pygame的Sprite相同的表示"""
+        return f'<{self.__class__.__name__} Sprite(in {len(self._groups)} groups)>'
@@ -0,0 +1,81 @@
+from typing import Dict, Iterable, List, Mapping, Union
+
+import pygame
+
+# 窗口内容可能丢失(被遮挡后重新显示、恢复、改变大小), 需要完整重绘的事件
+REDRAW_EVENTS = [
+    pygame.VIDEOEXPOSE, pygame.ACTIVEEVENT, pygame.WINDOWEXPOSED, pygame.WINDOWSHOWN,
+    pygame.WINDOWRESTORED, pygame.WINDOWMAXIMIZED, pygame.WINDOWSIZECHANGED,
+]
+
+# 游戏处理的事件类型, 其余事件不进入SDL事件队列; 窗口内容丢失的事件用于触发完整重绘
+HANDLED_EVENTS = [pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+                  *REDRAW_EVENTS]
+
+# 可以绑定按键的动作
+ACTIONS = ('left', 'right', 'fire', 'start', 'quit')
+
+
+def restrict_event_queue(event_types: Iterable[int] = HANDLED_EVENTS) -> None:
+    """只允许游戏处理的事件进入SDL事件队列, 需要在初始化显示模块之后调用"""
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed(list(event_types))
+
+
+def key_table(bindings: Mapping[str, Union[str, List[str]]]) -> Dict[int, str]:
+    """将动作到按键名的绑定转换为按键码到动作的查找表
+
+    按键名使用pygame.key.name()的写法, 如'left'、'space'、'a', 一个动作可以绑定多个按键
+    """
+    table = {}
+    for action, names in bindings.items():
+        if action not in ACTIONS:
+            raise ValueError(f'未知的动作: {action}, 可用的动作: {", ".join(ACTIONS)}')
+        for name in [names] if isinstance(names, str) else names:
+            try:
+                key = pygame.key.key_code(name)
+            except ValueError:
+                raise ValueError(f'未知的按键名: {name!r}') from None
+            if key in table and table[key] != action:
+                raise ValueError(f'按键{name!r}同时绑定到了{table[key]}和{action}')
+            table[key] = action
+    return table
+
+
+class FireControl:
+    """按住开火键时以固定射速连续开火, 由主循环的模拟步驱动
+
+    每次按下开火键至少发射一颗子弹, 两次开火的间隔不少于1/fire_rate秒,
+    冷却期间的按键在冷却结束后生效
+    """
+
+    def __init__(self, fire_rate: float) -> None:
+        """fire_rate为每秒最多发射的子弹数, 不大于0时不限制射速"""
+        self.interval = 1 / fire_rate if fire_rate > 0 else 0.0
+        self.held = False
+        self.pending = False
+        self.cooldown = 0.0
+
+    def press(self) -> None:
+        """按下开火键"""
+        self.held = True
+        self.pending = True
+
+    def release(self) -> None:
+        """松开开火键"""
+        self.held = False
+
+    def reset(self) -> None:
+        """清除未处理的按键和冷却时间, 开局或损失飞船时调用"""
+        self.pending = False
+        self.cooldown = 0.0
+
+    def update(self, dt: float) -> bool:
+        """推进一个模拟步, 返回本步是否开火"""
+        self.cooldown = max(0.0, self.cooldown - dt)
+        # 允许浮点误差, 使射击间隔恰好是模拟步长的整数倍时不会推迟一步
+        if (self.held or self.pending) and self.cooldown <= 1e-9:
+            self.pending = False
+            self.cooldown = self.interval
+            return True
+        return False
@@ -0,0 +1,202 @@
+from typing import Iterable, List, Tuple
+
+from pygame import Rect
+
+from fleet import to_pixel
+from settings import Settings
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖, 未安装时只能使用精灵编组
+    np = None
+
+
+class EntityStore:
+    """用NumPy数组保存外星人群和子弹状态的实体存储
+
+    移动、清除飞出屏幕的子弹和碰撞检测都以数组运算批量完成,
+    外星人和子弹精灵只作为渲染用的视图, 在绘制前由sync_sprites()同步位置
+    """
+
+    available = np is not None
+
+    def __init__(self, settings: Settings, screen_rect: Rect) -> None:
+        """初始化空的外星人群和子弹存储"""
+        if np is None:
+            raise ImportError('EntityStore需要安装NumPy')
+        self.settings = settings
+        self.screen_rect = screen_rect
+
+        self.load_fleet(())
+        self._init_bullets(settings.bullet_limit)
+
+    def load_fleet(self, aliens: Iterable) -> None:
+        """用一群新外星人的当前位置替换存储中的外星人群"""
+        sprites = list(aliens)
+        self.alien_sprites = sprites
+        self.alien_x = np.array([alien.x for alien in sprites], dtype=np.float64)
+        self.alien_y = np.array([alien.y for alien in sprites], dtype=np.float64)
+        self.alien_prev_x = self.alien_x.copy()
+        self.alien_prev_y = self.alien_y.copy()
+        self.alien_w = np.array([alien.rect.width for alien in sprites], dtype=np.int64)
+        self.alien_h = np.array([alien.rect.height for alien in sprites], dtype=np.int64)
+        self.alien_alive = np.ones(len(sprites), dtype=bool)
+        self._pending_drop = 0.0
+
+    def _init_bullets(self, capacity: int) -> None:
+        """分配指定容量的子弹数组"""
+        self.bullet_sprites = [None] * capacity
+        self.bullet_x = np.zeros(capacity, dtype=np.int64)
+        self.bullet_y = np.zeros(capacity, dtype=np.float64)
+        self.bullet_prev_y = np.zeros(capacity, dtype=np.float64)
+        self.bullet_w = np.zeros(capacity, dtype=np.int64)
+        self.bullet_h = np.zeros(capacity, dtype=np.int64)
+        self.bullet_active = np.zeros(capacity, dtype=bool)
+        # 发射序号, 碰撞时按发射顺序处理子弹, 与精灵编组的迭代顺序一致
+        self.bullet_seq = np.zeros(capacity, dtype=np.int64)
+        self._next_seq = 0
+
+    def _grow_bullets(self) -> None:
+        """子弹数组已满时将容量加倍"""
+        capacity = len(self.bullet_sprites)
+        old = (self.bullet_x, self.bullet_y, self.bullet_prev_y, self.bullet_w,
+               self.bullet_h, self.bullet_active, self.bullet_seq)
+        sprites, next_seq = self.bullet_sprites, self._next_seq
+        self._init_bullets(max(1, capacity * 2))
+        for new, values in zip((self.bullet_x, self.bullet_y, self.bullet_prev_y,
+                                self.bullet_w, self.bullet_h, self.bullet_active,
+                                self.bullet_seq), old):
+            new[:capacity] = values
+        self.bullet_sprites[:capacity] = sprites
+        self._next_seq = next_seq
+
+    def add_bullet(self, bullet) -> None:
+        """将一颗新发射的子弹加入存储"""
+        free = np.flatnonzero(~self.bullet_active)
+        if not len(free):
+            self._grow_bullets()
+            free = np.flatnonzero(~self.bullet_active)
+        slot = free[0]
+        self.bullet_sprites[slot] = bullet
+        self.bullet_x[slot] = bullet.rect.x
+        self.bullet_y[slot] = bullet.y
+        self.bullet_prev_y[slot] = bullet.y
+        self.bullet_w[slot] = bullet.rect.width
+        self.bullet_h[slot] = bullet.rect.height
+        self.bullet_active[slot] = True
+        self.bullet_seq[slot] = self._next_seq
+        self._next_seq += 1
+
+    def clear_bullets(self) -> None:
+        """删除所有子弹"""
+        self.bullet_active[:] = False
+        self.bullet_sprites = [None] * len(self.bullet_sprites)
+
+    def _remove_bullets(self, slots) -> None:
+        """删除指定位置的子弹及其精灵"""
+        for slot in slots:
+            self.bullet_sprites[slot].kill()
+            self.bullet_sprites[slot] = None
+        self.bullet_active[slots] = False
+
+    def update_bullets(self, dt: float) -> None:
+        """向上移动所有子弹, 并删除飞出屏幕的子弹"""
+        active = self.bullet_active
+        self.bullet_prev_y[active] = self.bullet_y[active]
+        self.bullet_y[active] -= self.settings.bullet_speed * dt
+
+        bottom = to_pixel(self.bullet_y) + self.bullet_h
+        self._remove_bullets(np.flatnonzero(active & (bottom <= 0)))
+
+    def collide(self) -> List[int]:
+        """检测子弹与外星人的碰撞并删除发生碰撞的子弹和外星人
+
+        返回每颗击中外星人的子弹所消灭的外星人数量, 按子弹发射顺序排列;
+        一个外星人被多颗子弹击中时只归属于最先发射的子弹
+        """
+        slots = np.flatnonzero(self.bullet_active)
+        if not len(slots) or not self.alien_alive.any():
+            return []
+        slots = slots[np.argsort(self.bullet_seq[slots])]
+
+        bx = self.bullet_x[slots][:, None]
+        by = to_pixel(self.bullet_y[slots])[:, None]
+        bw = self.bullet_w[slots][:, None]
+        bh = self.bullet_h[slots][:, None]
+        ax = to_pixel(self.alien_x)
+        ay = to_pixel(self.alien_y)
+
+        # 子弹数 x 外星人数的矩形重叠矩阵
+        overlap = ((bx < ax + self.alien_w) & (ax < bx + bw)
+                   & (by < ay + self.alien_h) & (ay < by + bh)
+                   & self.alien_alive)
+        hit = overlap.any(axis=0)
+        if not hit.any():
+            return []
+
+        victims = np.flatnonzero(hit)
+        owners = overlap[:, victims].argmax(axis=0)
+        counts = np.bincount(owners, minlength=len(slots))
+
+        self.alien_alive[victims] = False
+        for index in victims:
+            self.alien_sprites[index].kill()
+        self._remove_bullets(slots[counts > 0])
+
+        return [int(count) for count in counts if count]
+
+    def _alive_pixels(self):
+        """返回存活外星人的取整位置和尺寸"""
+        alive = self.alien_alive
+        return (to_pixel(self.alien_x[alive]), to_pixel(self.alien_y[alive]),
+                self.alien_w[alive], self.alien_h[alive])
+
+    def update_fleet(self, dt: float) -> Tuple[float, float]:
+        """检查外星人群是否到达屏幕边缘, 并整体移动外星人群, 返回本步的位移"""
+        if self.alien_alive.any():
+            x, _, w, _ = self._alive_pixels()
+            if (x + w).max() >= self.screen_rect.right or x.min() <= 0:
+                self._pending_drop += self.settings.fleet_drop_speed
+                self.settings.fleet_direction *= -1
+
+        dx = self.settings.alien_speed * self.settings.fleet_direction * dt
+        dy = self._pending_drop
+        self._pending_drop = 0.0
+
+        self.alien_prev_x[:] = self.alien_x
+        self.alien_prev_y[:] = self.alien_y
+        self.alien_x += dx
+        self.alien_y += dy
+        return dx, dy
+
+    def collide_rect(self, rect: Rect) -> bool:
+        """检查是否有存活的外星人与矩形重叠"""
+        if not self.alien_alive.any():
+            return False
+        x, y, w, h = self._alive_pixels()
+        return bool(((x < rect.right) & (rect.x < x + w)
+                     & (y < rect.bottom) & (rect.y < y + h)).any())
+
+    def reached_bottom(self) -> bool:
+        """检查是否有存活的外星人到达了屏幕底端"""
+        if not self.alien_alive.any():
+            return False
+        _, y, _, h = self._alive_pixels()
+        return bool(((y + h) >= self.screen_rect.bottom).any())
+
+    def sync_sprites(self) -> None:
+        """将数组中的位置写回外星人和子弹精灵, 供渲染使用"""
+        for index in np.flatnonzero(self.alien_alive):
+            alien = self.alien_sprites[index]
+            alien.x = float(self.alien_x[index])
+            alien.y = float(self.alien_y[index])
+            alien.prev_x = float(self.alien_prev_x[index])
+            alien.prev_y = float(self.alien_prev_y[index])
+            alien.rect.x = alien.x
+            alien.rect.y = alien.y
+
+        for slot in np.flatnonzero(self.bullet_active):
+            bullet = self.bullet_sprites[slot]
+            bullet.y = float(self.bullet_y[slot])
+            bullet.prev_y = float(self.bullet_prev_y[slot])
+            bullet.rect.y = bullet.y
@@ -0,0 +1,274 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pygame import Rect, Surface
+from pygame.sprite import Group
+
+from alien import Alien
+from settings import Settings
+
+
+def to_pixel(value):
+    """与pygame给Rect属性赋小数值时的取整方式一致(四舍五入, 0.5远离零)
+
+    value可以是小数或NumPy数组, 返回取整后的小数或小数数组
+    """
+    magnitude = (abs(value) + 0.5) // 1
+    # value < 0对小数得到bool, 对数组得到布尔数组, 都可以直接参与运算
+    return magnitude - 2 * magnitude * (value < 0)
+
+
+Bounds = Tuple[float, float, float, float]
+
+
+class BoundedGroup(Group):
+    """维护成员外接矩形的编组, 成员整体移动时外接矩形只需平移
+
+    外接矩形用小数表示, 仅在有成员离开编组后才遍历成员重新计算
+    """
+
+    def __init__(self) -> None:
+        """初始化空的外接矩形"""
+        super(BoundedGroup, self).__init__()
+        # 外接矩形(左, 上, 右, 下), 没有成员时为None
+        self._bounds: Optional[Bounds] = None
+        self._bounds_stale = False
+
+    def add_internal(self, sprite, layer=None) -> None:
+        """成员加入编组时扩展外接矩形"""
+        super(BoundedGroup, self).add_internal(sprite, layer)
+        if not self._bounds_stale:
+            self._extend_bounds(sprite)
+
+    def remove_internal(self, sprite) -> None:
+        """成员离开编组时标记外接矩形需要重新计算"""
+        super(BoundedGroup, self).remove_internal(sprite)
+        self._bounds_stale = True
+
+    def empty(self) -> None:
+        """删除所有成员并清空外接矩形"""
+        super(BoundedGroup, self).empty()
+        self._bounds = None
+        self._bounds_stale = False
+
+    def _get_bounds(self) -> Optional[Bounds]:
+        """返回外接矩形(左, 上, 右, 下), 有成员离开后才重新计算"""
+        if self._bounds_stale:
+            self._bounds_stale = False
+            self._bounds = None
+            for sprite in self.sprites():
+                self._extend_bounds(sprite)
+        return self._bounds
+
+    def _extend_bounds(self, sprite) -> None:
+        """将单个成员合并进外接矩形"""
+        left, top = sprite.x, sprite.y
+        self._merge_bounds((left, top, left + sprite.rect.width, top + sprite.rect.height))
+
+    def _merge_bounds(self, bounds: Bounds) -> None:
+        """将一个矩形合并进外接矩形"""
+        if self._bounds is None:
+            self._bounds = bounds
+        else:
+            left, top, right, bottom = bounds
+            b_left, b_top, b_right, b_bottom = self._bounds
+            self._bounds = (min(left, b_left), min(top, b_top),
+                            max(right, b_right), max(bottom, b_bottom))
+
+    def _shift_bounds(self, dx: float, dy: float) -> None:
+        """成员整体移动后平移外接矩形"""
+        if self._bounds is not None and not self._bounds_stale:
+            left, top, right, bottom = self._bounds
+            self._bounds = left + dx, top + dy, right + dx, bottom + dy
+
+    @property
+    def bounds(self) -> Optional[Rect]:
+        """外接矩形, 没有成员时为None"""
+        bounds = self._get_bounds()
+        if bounds is None:
+            return None
+        left, top, right, bottom = (int(to_pixel(value)) for value in bounds)
+        return Rect(left, top, right - left, bottom - top)
+
+
+class FleetRow(BoundedGroup):
+    """外星人群中的一行外星人
+
+    行内外星人的相对位置在外星人群移动时保持不变, 因此按生成时的x坐标排序后,
+    可以二分查找与某个矩形水平重叠的外星人; 行内的外星人全部被消灭时, 整行从外星人群中移除
+    """
+
+    def __init__(self, fleet: 'Fleet', slot_y: float) -> None:
+        """创建属于fleet的空行, slot_y为行生成时的y坐标"""
+        super(FleetRow, self).__init__()
+        self.fleet = fleet
+        self.slot_y = slot_y
+        # 按x坐标排序的外星人(包括已被消灭的)及其生成时的x坐标
+        self.lineup: List[Alien] = []
+        self._slot_xs: List[float] = []
+        self._alien_width = 0
+
+    def add_alien(self, alien: Alien) -> None:
+        """将刚生成的外星人加入行"""
+        index = bisect_right(self._slot_xs, alien.x)
+        self.lineup.insert(index, alien)
+        self._slot_xs.insert(index, alien.x)
+        self._alien_width = max(self._alien_width, alien.rect.width)
+        self.add(alien)
+
+    def remove_internal(self, sprite) -> None:
+        """最后一个外星人离开时将整行从外星人群中移除"""
+        super(FleetRow, self).remove_internal(sprite)
+        if not self.spritedict:
+            self.fleet.drop_row(self)
+
+    def candidates(self, rect: Rect, offset_x: float) -> List[Alien]:
+        """返回行内可能与矩形重叠的外星人, offset_x为外星人群生成以来的水平位移"""
+        bounds = self._get_bounds()
+        # 外星人的rect由小数位置取整得到, 比较时留出1像素余量
+        if bounds is None or rect.bottom < bounds[1] - 1 or rect.top > bounds[3] + 1:
+            return []
+        low = bisect_left(self._slot_xs, rect.left - self._alien_width - offset_x - 1)
+        high = bisect_right(self._slot_xs, rect.right - offset_x + 1)
+        alive = self.spritedict
+        return [alien for alien in self.lineup[low:high] if alien in alive]
+
+
+class Fleet(BoundedGroup):
+    """管理整群外星人的编组, 并维护外星人群的外接矩形
+
+    外星人群整体移动, 因此外接矩形只需随移动平移, 仅在有外星人被消灭后才重新计算,
+    边缘检测、改变方向和到达底部检测都无需遍历每个外星人.
+    外星人同时按行分组, 每行维护自己的外接矩形, 碰撞检测和绘制可以跳过整行
+    """
+
+    def __init__(self, screen: Surface, settings: Settings) -> None:
+        """初始化外星人群"""
+        super(Fleet, self).__init__()
+        self.screen = screen
+        self.screen_rect = screen.get_rect()
+        self.settings = settings
+        Alien.share(screen, settings)
+
+        # 创建过的所有外星人, 重新生成外星人群时重复使用
+        self._reserve: List[Alien] = []
+        # 还有外星人的行, 从上到下排列, 以及各行生成时的y坐标和最大行高
+        self.rows: List[FleetRow] = []
+        self._row_ys: List[float] = []
+        self._row_height = 0
+
+        # 外星人群自创建以来的累计位移, 碰撞索引据此换算外星人的当前位置
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+
+        # 下一步移动时需要下移的距离
+        self._pending_drop = 0.0
+
+    def empty(self) -> None:
+        """删除所有外星人并重置外星人群的状态"""
+        super(Fleet, self).empty()
+        rows, self.rows, self._row_ys = self.rows, [], []
+        for row in rows:
+            row.empty()
+        self._row_height = 0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self._pending_drop = 0.0
+
+    def drop_row(self, row: FleetRow) -> None:
+        """移除已没有外星人的行"""
+        if row in self.rows:
+            index = self.rows.index(row)
+            del self.rows[index]
+            del self._row_ys[index]
+
+    def respawn(self, slots: Iterable[Tuple[int, int]]) -> None:
+        """在阵型的各个位置重新生成外星人群, 尽量重复使用已创建的外星人"""
+        self.empty()
+        reserve = self._reserve
+        rows: Dict[int, FleetRow] = {}
+        for index, (x, y) in enumerate(slots):
+            if index == len(reserve):
+                reserve.append(Alien())
+            alien = reserve[index]
+            alien.reset(x, y)
+            self.add(alien)
+
+            row = rows.get(y)
+            if row is None:
+                row = rows[y] = FleetRow(self, alien.y)
+            row.add_alien(alien)
+            self._row_height = max(self._row_height, alien.rect.height)
+        self.rows = [rows[y] for y in sorted(rows)]
+        self._row_ys = [row.slot_y for row in self.rows]
+
+    def _get_bounds(self) -> Optional[Bounds]:
+        """返回外星人群的外接矩形, 有外星人被消灭后由各行的外接矩形合并得到"""
+        if self._bounds_stale:
+            self._bounds_stale = False
+            self._bounds = None
+            for row in self.rows:
+                self._merge_bounds(row._get_bounds())
+        return self._bounds
+
+    @property
+    def origin(self) -> Tuple[float, float]:
+        """外星人群自创建以来的累计位移"""
+        return self.offset_x, self.offset_y
+
+    def candidates(self, rect: Rect) -> List[Alien]:
+        """返回可能与矩形重叠的外星人, 只检查与矩形垂直方向重叠的行"""
+        bounds = self._get_bounds()
+        # 外星人的rect由小数位置取整得到, 比较时留出1像素余量
+        if bounds is None or rect.bottom < bounds[1] - 1 or rect.top > bounds[3] + 1:
+            return []
+        low = bisect_left(self._row_ys, rect.top - self._row_height - self.offset_y - 1)
+        high = bisect_right(self._row_ys, rect.bottom - self.offset_y + 1)
+        hits = []
+        for row in self.rows[low:high]:
+            hits.extend(row.candidates(rect, self.offset_x))
+        return hits
+
+    def check_edges(self) -> bool:
+        """检查外星人群是否有外星人到达了屏幕左右边缘"""
+        bounds = self._get_bounds()
+        if bounds is None:
+            return False
+        left, _, right, _ = bounds
+        return to_pixel(right) >= self.screen_rect.right or to_pixel(left) <= 0
+
+    def reached_bottom(self) -> bool:
+        """检查外星人群是否有外星人到达了屏幕底端"""
+        bounds = self._get_bounds()
+        return bounds is not None and to_pixel(bounds[3]) >= self.screen_rect.bottom
+
+    def change_direction(self) -> None:
+        """改变外星人群的方向, 下移在下一次移动时与水平移动一起完成"""
+        self._pending_drop += self.settings.fleet_drop_speed
+        self.settings.fleet_direction *= -1
+
+    def update(self, dt: float) -> None:
+        """整体移动外星人群, dt为模拟步长(秒)"""
+        dx = self.settings.alien_speed * self.settings.fleet_direction * dt
+        dy = self._pending_drop
+        self._pending_drop = 0.0
+
+        for alien in self.sprites():
+            alien.prev_x = alien.x
+            alien.prev_y = alien.y
+            alien.x += dx
+            alien.y += dy
+            alien.rect.x = alien.x
+            alien.rect.y = alien.y
+        self.shift(dx, dy)
+
+    def shift(self, dx: float, dy: float) -> None:
+        """记录外星人群的整体位移并平移外接矩形, 不移动外星人
+
+        外星人的位置保存在实体存储中时, 由实体存储移动外星人后调用
+        """
+        self.offset_x += dx
+        self.offset_y += dy
+        self._shift_bounds(dx, dy)
+        for row in self.rows:
+            row._shift_bounds(dx, dy)
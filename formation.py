@@ -0,0 +1,91 @@
+from typing import Callable, Dict, List, Tuple
+
+Slot = Tuple[int, int]
+Layout = Tuple[Slot, ...]
+
+
+def _grid_size(screen_width: int, screen_height: int, alien_width: int,
+               alien_height: int, ship_height: int) -> Tuple[int, int]:
+    """计算每行可容纳多少个外星人, 以及屏幕可容纳多少行外星人"""
+    # 外星人的间距为外星人宽度
+    available_space_x = screen_width - alien_width
+    number_aliens_x = available_space_x // (2 * alien_width)
+    available_space_y = screen_height - ship_height - 3 * alien_height
+    number_rows = available_space_y // (2 * alien_height)
+    return number_aliens_x, number_rows
+
+
+def grid_layout(screen_width: int, screen_height: int, alien_width: int,
+                alien_height: int, ship_height: int) -> List[Slot]:
+    """整齐排列的外星人群"""
+    number_aliens_x, number_rows = _grid_size(
+        screen_width, screen_height, alien_width, alien_height, ship_height)
+    return [(alien_width + 2 * alien_width * alien_number,
+             alien_height + 2 * alien_height * row_number)
+            for row_number in range(number_rows)
+            for alien_number in range(number_aliens_x)]
+
+
+def staggered_layout(screen_width: int, screen_height: int, alien_width: int,
+                     alien_height: int, ship_height: int) -> List[Slot]:
+    """奇数行向右错开一个外星人宽度的外星人群"""
+    number_aliens_x, number_rows = _grid_size(
+        screen_width, screen_height, alien_width, alien_height, ship_height)
+    slots = []
+    for row_number in range(number_rows):
+        shift = alien_width * (row_number % 2)
+        for alien_number in range(number_aliens_x):
+            x = alien_width + 2 * alien_width * alien_number + shift
+            # 右侧至少留出一个外星人宽度的空白
+            if x + 2 * alien_width <= screen_width:
+                slots.append((x, alien_height + 2 * alien_height * row_number))
+    return slots
+
+
+def wedge_layout(screen_width: int, screen_height: int, alien_width: int,
+                 alien_height: int, ship_height: int) -> List[Slot]:
+    """每行比上一行两端各少一个外星人的楔形外星人群"""
+    number_aliens_x, number_rows = _grid_size(
+        screen_width, screen_height, alien_width, alien_height, ship_height)
+    slots = []
+    for row_number in range(number_rows):
+        for alien_number in range(row_number, number_aliens_x - row_number):
+            slots.append((alien_width + 2 * alien_width * alien_number,
+                          alien_height + 2 * alien_height * row_number))
+    return slots
+
+
+FORMATIONS: Dict[str, Callable[..., List[Slot]]] = {
+    'grid': grid_layout,
+    'staggered': staggered_layout,
+    'wedge': wedge_layout,
+}
+
+
+class FormationCache:
+    """缓存外星人群阵型布局的类, 同样的屏幕和尺寸只计算一次"""
+
+    def __init__(self) -> None:
+        """初始化缓存和统计信息"""
+        self._layouts: Dict[tuple, Layout] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, screen_size: Tuple[int, int], alien_size: Tuple[int, int],
+            ship_height: int) -> Layout:
+        """返回阵型中每个外星人的左上角位置"""
+        if name not in FORMATIONS:
+            raise ValueError(f'未知的阵型: {name}')
+        key = name, screen_size, alien_size, ship_height
+        layout = self._layouts.get(key)
+        if layout is None:
+            self.misses += 1
+            layout = tuple(FORMATIONS[name](*screen_size, *alien_size, ship_height))
+            self._layouts[key] = layout
+        else:
+            self.hits += 1
+        return layout
+
+
+# 游戏中共享的阵型缓存
+formation_cache = FormationCache()
@@ -0,0 +1,66 @@
+from time import perf_counter
+from typing import Callable
+
+import pygame
+
+
+class GameLoop:
+    """以固定时间步长推进模拟, 并以限定帧率渲染的主循环计时器"""
+
+    def __init__(self, tick_rate: int, max_fps: int,
+                 max_frame_time: float = 0.25) -> None:
+        """初始化时钟和累加器
+
+        tick_rate为每秒模拟步数, max_fps为每秒最多渲染的帧数(0表示不限),
+        max_frame_time为单帧计入累加器的最长时间(秒), 避免长时间卡顿后陷入追赶
+        """
+        self.clock = pygame.time.Clock()
+        self.dt = 1.0 / tick_rate
+        self.max_fps = max_fps
+        # 每帧的时间预算, 不限帧率时以一个模拟步为预算
+        self.frame_budget = 1.0 / max_fps if max_fps else self.dt
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+
+        # 测量数据, 单位均为秒
+        self.frame_time = 0.0
+        self.tick_time = 0.0
+
+        # 计数器
+        self.ticks = 0
+        self.frames = 0
+        self.dropped_frames = 0
+
+    def advance(self, update: Callable[[float], None]) -> int:
+        """等待下一帧, 并执行累计时间所需的全部模拟步, 返回执行的步数
+
+        超出预算时一帧内会执行多个模拟步, 即丢弃中间帧而不是放慢模拟
+        """
+        self.frame_time = self.clock.tick(self.max_fps) / 1000.0
+        self.accumulator += min(self.frame_time, self.max_frame_time)
+
+        steps = 0
+        while self.accumulator >= self.dt:
+            start = perf_counter()
+            update(self.dt)
+            self.tick_time = perf_counter() - start
+            self.accumulator -= self.dt
+            steps += 1
+
+        self.ticks += steps
+        self.frames += 1
+        # 本帧耗时超过预算的整数倍部分即为被丢弃的帧
+        missed = int(self.frame_time / self.frame_budget) - 1
+        if missed > 0:
+            self.dropped_frames += missed
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        """上一模拟步与下一模拟步之间的插值系数, 取值范围[0, 1)"""
+        return self.accumulator / self.dt
+
+    @property
+    def fps(self) -> float:
+        """最近若干帧的平均帧率"""
+        return self.clock.get_fps()
@@ -1,34 +1,70 @@
+from enum import Enum
+from typing import Optional
+
+from score_store import ScoreStore
 from settings import Settings
 
 
+class GameState(Enum):
+    """游戏所处的状态"""
+    MENU = 'menu'  # 启动后等待玩家开始
+    PLAYING = 'playing'  # 正在游戏
+    RESPAWN = 'respawn'  # 损失一艘飞船后的暂停倒计时
+    GAME_OVER = 'game_over'  # 飞船用完, 等待玩家重新开始
+
+
 class GameStats:
     """跟踪游戏的统计信息"""
 
-    def __init__(self, settings: Settings) -> None:
-        """初始化统计信息"""
+    def __init__(self, settings: Settings, scores: Optional[ScoreStore] = None) -> None:
+        """初始化统计信息, scores为保存得分的存储, 为None时不保存"""
         self.settings = settings
+        self.scores = scores
         self.reset_stats()
 
-        # 游戏刚启动处于非活动状态
-        self.game_active = False
+        # 游戏刚启动处于菜单状态
+        self.state = GameState.MENU
+        # 复活暂停剩余的时间(秒)
+        self.respawn_time_left = 0.0
 
-        # 任何情况下都不应重置最高得分
-        self._init_high_score()
+        # 任何情况下都不应重置最高得分, 第一次读取时才从得分存储中取得
+        self._high_score: Optional[int] = None
 
-    def _init_high_score(self) -> None:
-        """初始化最高分"""
-        filename = self.settings.high_score_file
+    @property
+    def game_active(self) -> bool:
+        """游戏是否处于活动状态(包括复活暂停)"""
+        return self.state in (GameState.PLAYING, GameState.RESPAWN)
 
-        try:
-            with open(filename, 'r') as f:
-                high_score = f.read()
-        except FileNotFoundError:
-            high_score = 0
+    @property
+    def high_score(self) -> int:
+        """历史最高分, 第一次读取时等待得分存储加载完成"""
+        if self._high_score is None:
+            self._high_score = self.scores.high_score if self.scores is not None else 0
+        return self._high_score
 
-        self.high_score = int(high_score)
+    @high_score.setter
+    def high_score(self, score: int) -> None:
+        """更新最高分"""
+        self._high_score = score
+
+    def save_score(self) -> None:
+        """在后台保存本局的得分和等级"""
+        if self.scores is not None and self.score > 0:
+            self.scores.record(self.score, self.level)
 
     def reset_stats(self) -> None:
         """"初始化游戏运行期间可能变化的统计信息"""
         self.score = 0
         self.level = 1
         self.ships_left = self.settings.ship_limit - 1
+        self.reset_level_stats()
+        if self.scores is not None:
+            self.scores.new_run()
+
+    def reset_level_stats(self) -> None:
+        """初始化当前等级的统计信息, 开始新等级时调用"""
+        # 本等级发射的子弹数和消灭的外星人数
+        self.shots = 0
+        self.hits = 0
+        # 本等级已进行的游戏时间(秒), 不包括复活暂停
+        self.level_time = 0.0
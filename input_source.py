@@ -0,0 +1,91 @@
+import random
+from typing import Dict, List, Optional
+
+import pygame
+from pygame.event import Event
+
+
+class EventQueueInput:
+    """从pygame事件队列读取玩家输入, 窗口模式下的默认输入源"""
+
+    def poll(self, game) -> List[Event]:
+        """返回自上次调用以来的所有事件"""
+        return pygame.event.get()
+
+    def close(self, game) -> None:
+        """游戏退出时调用, 事件队列无需清理"""
+
+
+class ScriptedInput:
+    """按模拟步编号依次给出预先编排好的事件"""
+
+    def __init__(self, script: Dict[int, List[Event]]) -> None:
+        """script将模拟步编号映射到该步要处理的事件列表"""
+        self.script = script
+        self.tick = 0
+
+    def poll(self, game) -> List[Event]:
+        """返回当前模拟步的事件, 并前进到下一步"""
+        events = self.script.get(self.tick, [])
+        self.tick += 1
+        return events
+
+    def close(self, game) -> None:
+        """游戏退出时调用, 脚本输入源不持有资源"""
+
+
+class BotInput:
+    """根据游戏状态自动操作飞船的简单机器人
+
+    机器人移向最低处且离飞船最近的外星人, 并每隔fire_interval步按下并松开一次空格键开火;
+    每一步有hesitation的概率不做决定, 用随机种子控制, 使不同种子的对局各不相同
+    """
+
+    def __init__(self, seed: Optional[int] = None, fire_interval: int = 5,
+                 hesitation: float = 0.1, tolerance: int = 5) -> None:
+        """初始化机器人"""
+        self.random = random.Random(seed)
+        self.fire_interval = fire_interval
+        self.hesitation = hesitation
+        self.tolerance = tolerance
+        self.tick = 0
+
+        # 当前按下的方向键
+        self.held_key: Optional[int] = None
+
+    def _choose_key(self, game) -> Optional[int]:
+        """选择需要按住的方向键, 不需要移动时返回None"""
+        ship_x = game.ship.rect.centerx
+        aliens = game.aliens.sprites()
+        if not aliens:
+            return None
+        target = max(aliens, key=lambda alien: (alien.rect.bottom,
+                                                -abs(alien.rect.centerx - ship_x)))
+        if target.rect.centerx < ship_x - self.tolerance:
+            return pygame.K_LEFT
+        if target.rect.centerx > ship_x + self.tolerance:
+            return pygame.K_RIGHT
+        return None
+
+    def poll(self, game) -> List[Event]:
+        """根据当前局面生成本步的按键事件"""
+        events = []
+        self.tick += 1
+        if self.random.random() < self.hesitation:
+            return events
+
+        key = self._choose_key(game)
+        if key != self.held_key:
+            if self.held_key is not None:
+                events.append(Event(pygame.KEYUP, key=self.held_key))
+            if key is not None:
+                events.append(Event(pygame.KEYDOWN, key=key))
+            self.held_key = key
+
+        if self.tick % self.fire_interval == 0:
+            events.append(Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+            events.append(Event(pygame.KEYUP, key=pygame.K_SPACE))
+        return events
+
+    def close(self, game) -> None:
+        """游戏退出时调用, 机器人不持有资源"""
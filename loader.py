@@ -0,0 +1,89 @@
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import pygame
+from pygame import Rect, Surface
+
+Task = Tuple[str, Callable[[], object]]
+
+
+class AssetLoader:
+    """在后台线程中依次执行加载任务的类, 主线程根据progress显示加载进度"""
+
+    def __init__(self, tasks: List[Task]) -> None:
+        """tasks为(名称, 无参数函数)列表"""
+        self.tasks = tasks
+        self.done = 0
+        self.current = ''
+        self.error: Optional[BaseException] = None
+        self._finished = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='asset-loader', daemon=True)
+
+    def start(self) -> 'AssetLoader':
+        """启动后台线程"""
+        self._thread.start()
+        return self
+
+    @property
+    def progress(self) -> float:
+        """已完成任务的比例"""
+        return self.done / len(self.tasks) if self.tasks else 1.0
+
+    @property
+    def ready(self) -> bool:
+        """所有任务是否都已结束"""
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待所有任务结束, 返回是否已结束"""
+        return self._finished.wait(timeout)
+
+    def result(self) -> None:
+        """等待所有任务结束, 加载失败时在主线程中重新引发异常"""
+        self.wait()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self) -> None:
+        """后台线程: 依次执行任务, 出错时停止"""
+        try:
+            for name, task in self.tasks:
+                self.current = name
+                task()
+                self.done += 1
+        except BaseException as e:
+            self.error = e
+        finally:
+            self._finished.set()
+
+
+class LoadingScreen:
+    """加载期间显示的进度条, 不依赖字体和图像"""
+
+    def __init__(self, screen: Surface, bg_color, bar_color=(60, 60, 60)) -> None:
+        """在屏幕中央放置进度条"""
+        self.screen = screen
+        self.bg_color = bg_color
+        self.bar_color = bar_color
+        self.rect = Rect(0, 0, screen.get_width() // 3, 12)
+        self.rect.center = screen.get_rect().center
+
+    def draw(self, progress: float) -> None:
+        """绘制进度条并推送到屏幕"""
+        self.screen.fill(self.bg_color, self.rect)
+        pygame.draw.rect(self.screen, self.bar_color, self.rect, 1)
+        filled = self.rect.inflate(-4, -4)
+        filled.width = round(filled.width * progress)
+        self.screen.fill(self.bar_color, filled)
+        pygame.display.update(self.rect)
+
+    def run(self, loader: AssetLoader, on_quit: Callable[[], None],
+            frame_time: float = 1 / 60) -> None:
+        """显示进度直到加载结束, 期间继续处理窗口事件"""
+        self.screen.fill(self.bg_color)
+        pygame.display.flip()
+        while not loader.wait(frame_time):
+            for event in pygame.event.get(pygame.QUIT):
+                on_quit()
+            self.draw(loader.progress)
+        self.draw(1.0)
@@ -0,0 +1,153 @@
+import csv
+import json
+from array import array
+from functools import wraps
+from time import perf_counter_ns
+from typing import Callable, Dict, List, Optional
+
+from pygame import Surface
+
+from assets import font_cache
+from renderer import Renderer
+
+
+class FrameProfiler:
+    """记录每帧各阶段耗时的性能分析器
+
+    被包装的函数每次调用的耗时(纳秒)累加到当前帧, end_frame()时写入环形缓冲区,
+    缓冲区只保留最近capacity帧; 阶段之间可以嵌套, 外层阶段的耗时包含内层阶段
+    """
+
+    def __init__(self, capacity: int = 3600) -> None:
+        """初始化环形缓冲区"""
+        self.capacity = capacity
+        self.phases: List[str] = []
+        self._current: Dict[str, int] = {}
+        self._series: Dict[str, array] = {}
+        self._frame_times = array('q', bytes(8 * capacity))
+        self._counts: Dict[str, array] = {}
+
+        # 下一帧写入的位置和已记录的帧数
+        self._index = 0
+        self.frames = 0
+        self._last_frame = perf_counter_ns()
+
+    def _add_series(self, series: Dict[str, array], name: str) -> None:
+        """为新的阶段或实体类型分配缓冲区"""
+        series[name] = array('q', bytes(8 * self.capacity))
+
+    def wrap(self, name: str, func: Callable) -> Callable:
+        """返回记录func耗时的包装函数"""
+        self.phases.append(name)
+        self._current[name] = 0
+        self._add_series(self._series, name)
+        current = self._current
+
+        @wraps(func)
+        def timed(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                current[name] += perf_counter_ns() - start
+
+        return timed
+
+    def end_frame(self, counts: Optional[Dict[str, int]] = None) -> None:
+        """结束当前帧, 记录各阶段耗时、帧时间和实体数量"""
+        now = perf_counter_ns()
+        index = self._index
+        self._frame_times[index] = now - self._last_frame
+        self._last_frame = now
+
+        for name, elapsed in self._current.items():
+            self._series[name][index] = elapsed
+            self._current[name] = 0
+        for name, count in (counts or {}).items():
+            if name not in self._counts:
+                self._add_series(self._counts, name)
+            self._counts[name][index] = count
+
+        self._index = (index + 1) % self.capacity
+        self.frames += 1
+
+    def _ordered(self, values: array) -> List[int]:
+        """按时间顺序返回缓冲区中已记录的值"""
+        if self.frames < self.capacity:
+            return values[:self.frames].tolist()
+        return (values[self._index:] + values[:self._index]).tolist()
+
+    def percentile(self, fraction: float, name: Optional[str] = None) -> float:
+        """返回帧时间(或指定阶段耗时)的百分位数, 单位为毫秒"""
+        values = sorted(self._ordered(self._frame_times if name is None
+                                      else self._series[name]))
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(fraction * len(values)))] / 1e6
+
+    def latest_counts(self) -> Dict[str, int]:
+        """返回最近一帧记录的实体数量"""
+        last = (self._index - 1) % self.capacity
+        return {name: values[last] for name, values in self._counts.items()}
+
+    def rows(self) -> List[Dict[str, float]]:
+        """按时间顺序返回每帧的记录, 耗时单位为毫秒"""
+        columns = {'frame_ms': self._ordered(self._frame_times)}
+        for name in self.phases:
+            columns[f'{name}_ms'] = self._ordered(self._series[name])
+        milliseconds = list(columns)
+        for name, values in self._counts.items():
+            columns[name] = self._ordered(values)
+
+        start = self.frames - len(columns['frame_ms'])
+        rows = []
+        for offset in range(len(columns['frame_ms'])):
+            row = {'frame': start + offset}
+            for name, values in columns.items():
+                value = values[offset]
+                row[name] = value / 1e6 if name in milliseconds else value
+            rows.append(row)
+        return rows
+
+    def export(self, path: str) -> None:
+        """将时间序列写入文件, 扩展名为.json时写入JSON, 否则写入CSV"""
+        rows = self.rows()
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            if path.endswith('.json'):
+                json.dump(rows, f, indent=2)
+            elif rows:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+                writer.writeheader()
+                writer.writerows(rows)
+
+
+class ProfilerOverlay:
+    """在屏幕左下角显示帧率、帧时间百分位数和实体数量的叠加层"""
+
+    def __init__(self, profiler: FrameProfiler, screen: Surface,
+                 refresh_frames: int = 30, font_name: str = '') -> None:
+        """初始化叠加层, 每refresh_frames帧更新一次内容"""
+        self.profiler = profiler
+        self.screen_rect = screen.get_rect()
+        self.refresh_frames = refresh_frames
+        self.font = font_cache.get(font_name, 24)
+        self.text_color = 30, 30, 30
+        self.image: Optional[Surface] = None
+        self.rect = None
+
+    def _prep_image(self, fps: float) -> None:
+        """将当前的统计数据渲染为图像"""
+        profiler = self.profiler
+        counts = ' '.join(f'{name}={count}'
+                          for name, count in profiler.latest_counts().items())
+        text = (f'{fps:.0f} fps  p50 {profiler.percentile(0.5):.2f} ms  '
+                f'p99 {profiler.percentile(0.99):.2f} ms  {counts}')
+        self.image = self.font.render(text, True, self.text_color)
+        self.rect = self.image.get_rect()
+        self.rect.bottomleft = 10, self.screen_rect.bottom - 10
+
+    def draw(self, renderer: Renderer, fps: float) -> None:
+        """绘制叠加层"""
+        if self.image is None or self.profiler.frames % self.refresh_frames == 0:
+            self._prep_image(fps)
+        renderer.blit(self.image, self.rect)
@@ -0,0 +1,140 @@
+from typing import Dict, Hashable, List, Tuple
+
+import pygame
+from pygame import Rect, Surface
+
+Color = Tuple[int, int, int]
+Position = Tuple[float, float]
+
+# 擦除用的背景色图块边长, 更大的区域直接填充
+ERASE_TILE_SIZE = 256
+
+
+class Renderer:
+    """把每帧的绘制内容输出到屏幕的类
+
+    脏矩形模式下只擦除上一帧绘制过的区域, 并且只把发生变化的区域推送到显示器;
+    关闭脏矩形模式时每帧填充整个屏幕并调用display.flip().
+    很少变化的叠加内容(如HUD)通过overlay()绘制, 不随每帧擦除, 只在改变或被覆盖时重绘.
+    小区域从背景色图块复制而不是填充: SDL填充小矩形时使用绕过缓存的流式写入, 比复制慢数倍
+    """
+
+    def __init__(self, screen: Surface, bg_color: Color, dirty_rects: bool = True) -> None:
+        """初始化渲染器"""
+        self.screen = screen
+        self.bg_color = bg_color
+        self.dirty_rects = dirty_rects
+        # 与屏幕像素格式相同的背景色图块
+        self._erase_tile = Surface((ERASE_TILE_SIZE, ERASE_TILE_SIZE), 0, screen)
+        self._erase_tile.fill(bg_color)
+
+        # 上一帧和当前帧绘制的内容, 键由图像(或颜色)和位置组成
+        self._drawn: Dict[Hashable, Rect] = {}
+        self._frame: Dict[Hashable, Rect] = {}
+        # 上一帧和当前帧的叠加内容, 键与绘制的内容相同, 值为图像和位置
+        self._overlays: Dict[Hashable, Tuple[Surface, Rect]] = {}
+        self._frame_overlays: Dict[Hashable, Tuple[Surface, Rect]] = {}
+        # 本帧擦除的区域
+        self._erased: List[Rect] = []
+        # 为True时下一帧进行完整重绘
+        self._full_redraw = True
+
+        # 推送到显示器的像素统计
+        self.pixels_pushed = 0
+        self.total_pixels_pushed = 0
+        self.frames = 0
+
+    def invalidate(self) -> None:
+        """要求下一帧完整重绘, 用于原地修改了已绘制的图像或窗口内容丢失的情况"""
+        self._full_redraw = True
+
+    def _erase(self, rect: Rect) -> None:
+        """用背景色覆盖矩形区域"""
+        if rect.width <= ERASE_TILE_SIZE and rect.height <= ERASE_TILE_SIZE:
+            self.screen.blit(self._erase_tile, rect, (0, 0, rect.width, rect.height))
+        else:
+            self.screen.fill(self.bg_color, rect)
+
+    def begin_frame(self) -> None:
+        """擦除上一帧的内容, 开始绘制新的一帧"""
+        if self.dirty_rects and not self._full_redraw:
+            self._erased = list(self._drawn.values())
+            for rect in self._erased:
+                self._erase(rect)
+        else:
+            self.screen.fill(self.bg_color)
+        self._frame = {}
+        self._frame_overlays = {}
+
+    def blit(self, image: Surface, pos: Position) -> Rect:
+        """在指定位置绘制图像"""
+        rect = self.screen.blit(image, pos)
+        self._frame[(image, rect.x, rect.y, rect.width, rect.height)] = rect
+        return rect
+
+    def fill(self, color: Color, rect: Tuple[float, float, float, float]) -> Rect:
+        """用颜色填充指定矩形"""
+        rect = self.screen.fill(color, rect)
+        self._frame[(color, rect.x, rect.y, rect.width, rect.height)] = rect
+        return rect
+
+    def overlay(self, image: Surface, pos: Position) -> Rect:
+        """在本帧所有内容之上绘制很少变化的图像, 同一帧内先登记的在下面
+
+        图像和位置与上一帧相同时, 只有被本帧擦除或绘制的区域覆盖才重新绘制
+        """
+        rect = Rect((pos[0], pos[1]), image.get_size())
+        self._frame_overlays[(image, rect.x, rect.y, rect.width, rect.height)] = image, rect
+        return rect
+
+    def _redraw_under(self, area: Rect) -> None:
+        """擦除已消失的叠加内容所在的区域, 并重绘本帧绘制在该区域内的内容"""
+        self._erase(area)
+        for key, rect in self._frame.items():
+            if rect.colliderect(area):
+                if isinstance(key[0], Surface):
+                    self.screen.blit(key[0], rect)
+                else:
+                    self.screen.fill(key[0], rect)
+
+    def _draw_overlays(self) -> List[Rect]:
+        """绘制叠加内容, 返回需要推送到显示器的区域"""
+        overlays, previous = self._frame_overlays, self._overlays
+        self._overlays = overlays
+        if not self.dirty_rects or self._full_redraw:
+            for image, rect in overlays.values():
+                self.screen.blit(image, rect)
+            return []
+
+        removed = [rect for key, (_, rect) in previous.items() if key not in overlays]
+        for rect in removed:
+            self._redraw_under(rect)
+        # 未改变的叠加内容只在被本帧擦除或绘制的区域覆盖时重绘
+        touched = self._erased + list(self._frame.values()) + removed
+        changed = removed
+        for key, (image, rect) in overlays.items():
+            if key not in previous:
+                self.screen.blit(image, rect)
+                changed.append(rect)
+            elif rect.collidelist(touched) != -1:
+                self.screen.blit(image, rect)
+        return changed
+
+    def end_frame(self) -> None:
+        """将当前帧推送到显示器"""
+        changed_overlays = self._draw_overlays()
+        if self.dirty_rects and not self._full_redraw:
+            # 新出现的内容和已消失的内容所在的区域都需要更新
+            changed = [rect for key, rect in self._frame.items() if key not in self._drawn]
+            changed += [rect for key, rect in self._drawn.items() if key not in self._frame]
+            changed += [rect.clip(self.screen.get_rect()) for rect in changed_overlays]
+            pygame.display.update(changed)
+            self.pixels_pushed = sum(rect.width * rect.height for rect in changed)
+        else:
+            pygame.display.flip()
+            self.pixels_pushed = self.screen.get_width() * self.screen.get_height()
+            self._full_redraw = False
+
+        self._drawn = self._frame
+        self.total_pixels_pushed += self.pixels_pushed
+        self.frames += 1
@@ -0,0 +1,194 @@
+"""记录玩家输入并以无窗口模式确定性地回放
+
+录制: python alien_invasion.py --record run.airp
+回放并校验最终得分: python replay.py run.airp
+"""
+import json
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+import pygame
+from pygame.event import Event
+
+from settings import Settings
+
+# 文件头: 魔数、版本、模拟频率、屏幕宽高、总模拟步数、最终得分、最终等级
+HEADER = struct.Struct('<4sBHHHIQH')
+MAGIC = b'AIRP'
+# 版本2: 开火由按下和松开开火键的状态决定, 与版本1的录像不兼容
+# 版本3: 文件头之后保存录制时与默认值不同的全部设置, 回放时按相同的设置运行
+VERSION = 3
+
+# 设置部分的长度, 之后是UTF-8编码的JSON对象
+SETTINGS_LENGTH = struct.Struct('<I')
+
+# 事件记录: 距上一条记录的模拟步数、事件类型、按键(或鼠标x, y坐标), 两种记录长度相同
+KEY_RECORD = struct.Struct('<HBi')
+MOUSE_RECORD = struct.Struct('<HBhh')
+
+# 事件类型编码, 0用于步数间隔超过记录范围时的占位记录
+SKIP, KEYDOWN, KEYUP, MOUSEBUTTONDOWN = 0, 1, 2, 3
+EVENT_CODES = {
+    pygame.KEYDOWN: KEYDOWN,
+    pygame.KEYUP: KEYUP,
+    pygame.MOUSEBUTTONDOWN: MOUSEBUTTONDOWN,
+}
+MAX_DELTA = 0xFFFF
+
+TickEvent = Tuple[int, Event]
+
+
+class InputRecorder:
+    """包装另一个输入源, 记录游戏处理的每个按键和鼠标事件及其所在的模拟步"""
+
+    def __init__(self, source, path: str) -> None:
+        """source为实际提供事件的输入源, 录像在close()时写入path"""
+        self.source = source
+        self.path = path
+        self.events: List[TickEvent] = []
+
+    def poll(self, game) -> List[Event]:
+        """从被包装的输入源取得事件, 并记录需要回放的事件"""
+        events = self.source.poll(game)
+        tick = game.loop.ticks
+        for event in events:
+            if event.type in EVENT_CODES:
+                self.events.append((tick, event))
+        return events
+
+    def close(self, game) -> None:
+        """将录像和游戏的最终结果写入文件"""
+        self.source.close(game)
+        settings, stats = game.settings, game.stats
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, settings.tick_rate,
+                                settings.screen_width, settings.screen_height,
+                                game.loop.ticks, stats.score, stats.level))
+            f.write(encode_settings(settings))
+            f.write(encode_events(self.events))
+
+
+def encode_settings(settings: Settings) -> bytes:
+    """将与默认值不同的设置编码为带长度前缀的JSON"""
+    data = json.dumps(settings.non_defaults(), ensure_ascii=False).encode('utf-8')
+    return SETTINGS_LENGTH.pack(len(data)) + data
+
+
+def decode_settings(data: bytes, offset: int = 0) -> Tuple[Dict[str, Any], int]:
+    """从offset处解码设置, 返回设置值和设置部分之后的位置"""
+    (length,) = SETTINGS_LENGTH.unpack_from(data, offset)
+    offset += SETTINGS_LENGTH.size
+    values = json.loads(data[offset:offset + length].decode('utf-8'))
+    if not isinstance(values, dict):
+        raise ValueError('录像中的设置应为键值表')
+    return values, offset + length
+
+
+def encode_events(events: List[TickEvent]) -> bytes:
+    """将事件按模拟步的增量编码为紧凑的二进制数据"""
+    chunks = []
+    last_tick = 0
+    for tick, event in events:
+        delta = tick - last_tick
+        while delta > MAX_DELTA:
+            chunks.append(KEY_RECORD.pack(MAX_DELTA, SKIP, 0))
+            delta -= MAX_DELTA
+        code = EVENT_CODES[event.type]
+        if code == MOUSEBUTTONDOWN:
+            chunks.append(MOUSE_RECORD.pack(delta, code, *event.pos))
+        else:
+            chunks.append(KEY_RECORD.pack(delta, code, event.key))
+        last_tick = tick
+    return b''.join(chunks)
+
+
+def decode_events(data: bytes) -> List[TickEvent]:
+    """将二进制数据解码为(模拟步, 事件)列表"""
+    events = []
+    tick = 0
+    for offset in range(0, len(data), KEY_RECORD.size):
+        delta, code, key = KEY_RECORD.unpack_from(data, offset)
+        tick += delta
+        if code == KEYDOWN:
+            events.append((tick, Event(pygame.KEYDOWN, key=key)))
+        elif code == KEYUP:
+            events.append((tick, Event(pygame.KEYUP, key=key)))
+        elif code == MOUSEBUTTONDOWN:
+            _, _, x, y = MOUSE_RECORD.unpack_from(data, offset)
+            events.append((tick, Event(pygame.MOUSEBUTTONDOWN, pos=(x, y), button=1)))
+    return events
+
+
+class Replay:
+    """从文件读取的录像"""
+
+    def __init__(self, path: str) -> None:
+        """读取并解析录像文件"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        (magic, version, self.tick_rate, self.screen_width, self.screen_height,
+         self.ticks, self.score, self.level) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'不是受支持的录像文件: {path}')
+        # 录制时与默认值不同的设置
+        self.config, offset = decode_settings(data, HEADER.size)
+        self.events = decode_events(data[offset:])
+
+    def settings(self) -> Settings:
+        """返回录制时使用的设置, 设置值不合法时引发ValueError"""
+        settings = Settings()
+        settings.update(self.config)
+        return settings
+
+
+class ReplayInput:
+    """在录制时的模拟步依次给出录像中的事件"""
+
+    def __init__(self, events: List[TickEvent]) -> None:
+        """events为按模拟步排序的(模拟步, 事件)列表"""
+        self.events = events
+        self.index = 0
+
+    def poll(self, game) -> List[Event]:
+        """返回当前模拟步的事件"""
+        tick = game.loop.ticks
+        batch = []
+        while self.index < len(self.events) and self.events[self.index][0] <= tick:
+            batch.append(self.events[self.index][1])
+            self.index += 1
+        return batch
+
+    def close(self, game) -> None:
+        """回放输入源不持有资源"""
+
+
+def replay(path: str, settings: Optional[Settings] = None):
+    """以无窗口模式全速回放录像, 返回回放结束时的游戏统计信息和录像本身"""
+    from alien_invasion import AlienInvasion
+
+    recording = Replay(path)
+    if settings is None:
+        settings = recording.settings()
+    game = AlienInvasion(settings, headless=True,
+                         input_source=ReplayInput(recording.events))
+    stats = game.run_headless(recording.ticks, start=False)
+    return stats, recording
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """回放录像并校验最终得分与录制时一致"""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        sys.exit('用法: python replay.py <录像文件>')
+
+    stats, recording = replay(argv[0])
+    print(f'回放{recording.ticks}步, {len(recording.events)}个事件: '
+          f'得分{stats.score:,}(录制时{recording.score:,}), '
+          f'等级{stats.level}(录制时{recording.level})')
+    if stats.score != recording.score or stats.level != recording.level:
+        sys.exit('回放结果与录制时不一致')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+"""保存得分和排行榜的SQLite数据库
+
+查看排行榜: python score_store.py [数据库文件] [--player NAME] [--preset NAME]
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+import warnings
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from settings import Settings, resolve_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    run TEXT PRIMARY KEY,
+    player TEXT NOT NULL,
+    preset TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_by_player ON scores (player, preset, score DESC);
+"""
+
+UPSERT = """
+INSERT INTO scores (run, player, preset, score, level, created_at) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (run) DO UPDATE SET
+    score = excluded.score, level = excluded.level, created_at = excluded.created_at
+"""
+
+# 只保留每个玩家和预设得分最高的若干条记录
+TRIM = """
+DELETE FROM scores WHERE player = ? AND preset = ? AND run NOT IN (
+    SELECT run FROM scores WHERE player = ? AND preset = ? ORDER BY score DESC LIMIT ?)
+"""
+
+SELECT = """
+SELECT score, level, created_at FROM scores WHERE player = ? AND preset = ?
+ORDER BY score DESC, created_at LIMIT ?
+"""
+
+# 提交给后台线程的记录: 对局编号、得分、等级、时间戳
+Record = Tuple[str, int, int, float]
+
+
+class ScoreEntry(NamedTuple):
+    """排行榜中的一条记录"""
+    score: int
+    level: int
+    created_at: float
+
+
+class ScoreStore:
+    """按玩家和设置预设保存排行榜的得分存储
+
+    数据库的读写都在后台线程中进行: 创建时开始加载排行榜, 第一次读取时才等待加载完成;
+    record()只把记录放入队列, 后台线程合并同一局的多次记录后在一个事务中写入,
+    磁盘I/O不会发生在游戏的帧内
+    """
+
+    def __init__(self, path: str, player: str, preset: str = '', size: int = 10,
+                 legacy_file: str = '') -> None:
+        """开始在后台线程中加载排行榜, legacy_file为数据库为空时导入的旧最高分文件"""
+        self.path = resolve_path(path)
+        self.player = player
+        self.preset = preset
+        self.size = size
+        self.legacy_file = resolve_path(legacy_file) if legacy_file else ''
+
+        self._leaderboard: List[ScoreEntry] = []
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._queue: 'queue.Queue[Optional[Record]]' = queue.Queue()
+
+        # 当前对局的编号, 同一局的多次记录只保存最后一次
+        self.run = ''
+        self.new_run()
+
+        self._thread = threading.Thread(target=self._run, name='score-store', daemon=True)
+        self._thread.start()
+
+    def new_run(self) -> None:
+        """开始新的一局"""
+        self.run = uuid.uuid4().hex
+
+    def leaderboard(self) -> List[ScoreEntry]:
+        """返回排行榜, 按得分从高到低排列, 必要时等待加载完成"""
+        self._loaded.wait()
+        with self._lock:
+            return list(self._leaderboard)
+
+    @property
+    def high_score(self) -> int:
+        """排行榜中的最高分"""
+        leaderboard = self.leaderboard()
+        return leaderboard[0].score if leaderboard else 0
+
+    def record(self, score: int, level: int) -> None:
+        """异步保存当前对局的得分和等级"""
+        self._queue.put((self.run, score, level, time.time()))
+
+    def close(self) -> None:
+        """写入队列中剩余的记录并结束后台线程"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """打开数据库并创建表, 失败时返回None"""
+        try:
+            conn = sqlite3.connect(self.path)
+            conn.executescript(SCHEMA)
+            return conn
+        except sqlite3.DatabaseError as e:
+            warnings.warn(f'无法打开得分数据库{self.path}, 本次得分不会保存: {e}')
+            return None
+
+    def _import_legacy(self, conn: sqlite3.Connection) -> None:
+        """数据库中没有记录时导入旧版本保存在文本文件中的最高分"""
+        if not self.legacy_file or conn.execute('SELECT 1 FROM scores LIMIT 1').fetchone():
+            return
+        try:
+            with open(self.legacy_file, encoding='utf-8') as f:
+                score = int(f.read())
+        except (OSError, ValueError):
+            return
+        with conn:
+            conn.execute(UPSERT, ('legacy', self.player, self.preset, score, 0,
+                                  os.path.getmtime(self.legacy_file)))
+
+    def _load(self, conn: sqlite3.Connection) -> None:
+        """从数据库读取排行榜"""
+        rows = conn.execute(SELECT, (self.player, self.preset, self.size)).fetchall()
+        with self._lock:
+            self._leaderboard = [ScoreEntry(*row) for row in rows]
+
+    def _write(self, conn: sqlite3.Connection, records: Dict[str, Record]) -> None:
+        """在一个事务中写入记录并裁剪排行榜"""
+        player, preset = self.player, self.preset
+        with conn:
+            for run, score, level, created_at in records.values():
+                conn.execute(UPSERT, (run, player, preset, score, level, created_at))
+            conn.execute(TRIM, (player, preset, player, preset, self.size))
+        self._load(conn)
+
+    def _run(self) -> None:
+        """后台线程: 加载排行榜, 然后循环写入队列中的记录"""
+        conn = self._connect()
+        try:
+            if conn is not None:
+                self._import_legacy(conn)
+                self._load(conn)
+        except sqlite3.DatabaseError as e:
+            warnings.warn(f'无法读取得分数据库{self.path}, 本次得分不会保存: {e}')
+            conn = None
+        finally:
+            self._loaded.set()
+
+        stop = False
+        while not stop:
+            # 一次取出队列中的所有记录, 同一局只保留最后一次
+            records: Dict[str, Record] = {}
+            item = self._queue.get()
+            while True:
+                if item is None:
+                    stop = True
+                else:
+                    records[item[0]] = item
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if conn is not None and records:
+                try:
+                    self._write(conn, records)
+                except sqlite3.DatabaseError as e:
+                    warnings.warn(f'写入得分数据库{self.path}失败: {e}')
+        if conn is not None:
+            conn.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """打印排行榜"""
+    settings = Settings()
+    parser = argparse.ArgumentParser(description='《外星人入侵》排行榜')
+    parser.add_argument('path', nargs='?', default=settings.score_db, help='得分数据库')
+    parser.add_argument('--player', default=settings.player_name, help='玩家名称')
+    parser.add_argument('--preset', default='', help='设置预设')
+    parser.add_argument('--size', type=int, default=settings.leaderboard_size,
+                        help='显示的记录数')
+    args = parser.parse_args(argv)
+
+    store = ScoreStore(args.path, args.player, args.preset, args.size)
+    for rank, entry in enumerate(store.leaderboard(), 1):
+        created_at = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry.created_at))
+        print(f'{rank:>3}. {entry.score:>12,}  等级{entry.level:>3}  {created_at}')
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,13 @@
-import pygame.font
+import math
+
+import pygame
 from pygame import Surface
-from pygame.sprite import Group
 
+from assets import font_cache, image_cache
 from game_stats import GameStats
+from renderer import Renderer
 from settings import Settings
-from ship import Ship
+from text_cache import TextRenderer
 
 
 class Scoreboard:
@@ -18,67 +21,139 @@ class Scoreboard:
 
         # 显示得分信息时使用的字体设置
         self.text_color = 30, 30, 30
-        self.font = pygame.font.SysFont(None, 48)
+        self.font = font_cache.get(self.settings.font_name, 48)
+        # 缓存数字字形和已渲染文本的渲染器
+        self.text = TextRenderer(self.font, self.text_color, self.settings.bg_color)
 
+        # 需要重新渲染的图像, 同一步内的多次更新只在绘制前渲染一次
+        self._dirty = set()
         self.prep_images()
+        self.flush()
+
+        # 剩余飞船共用一个图标, 预先拼成一条, 绘制时只截取需要的数量
+        self.ship_icon = image_cache.get(self.settings.ship_image)
+        if self.settings.hud_ship_scale != 1:
+            size = (round(self.ship_icon.get_width() * self.settings.hud_ship_scale),
+                    round(self.ship_icon.get_height() * self.settings.hud_ship_scale))
+            self.ship_icon = pygame.transform.smoothscale(self.ship_icon, size)
+        # 按飞船数量缓存的剩余飞船图像, 数量不变时渲染器不必重绘
+        self._lives_images = {}
+        self._prep_lives_strip(self.settings.ship_limit)
+
+        # 复活倒计时的图像
+        self.countdown_image = None
+        self.countdown_rect = None
 
     def prep_images(self) -> None:
-        """准备包含当前得分、最高得分、等级和剩余飞船的图像"""
+        """准备包含当前得分、最高得分和等级的图像, 剩余飞船在显示时读取"""
         self.prep_score()
         self.prep_high_score()
         self.prep_level()
-        self.prep_ships()
 
     def prep_score(self) -> None:
+        """标记当前得分的图像需要重新渲染"""
+        self._dirty.add('score')
+
+    def prep_high_score(self) -> None:
+        """标记最高得分的图像需要重新渲染"""
+        self._dirty.add('high_score')
+
+    def prep_level(self) -> None:
+        """标记等级的图像需要重新渲染"""
+        self._dirty.add('level')
+
+    def flush(self) -> None:
+        """渲染所有被标记的图像, 得分在一步内多次变化时只渲染最终的值"""
+        dirty = self._dirty
+        if not dirty:
+            return
+        # 最高得分和等级的位置依赖于得分的位置, 因此先渲染得分
+        if 'score' in dirty:
+            self._render_score()
+        if 'high_score' in dirty:
+            self._render_high_score()
+        if 'level' in dirty:
+            self._render_level()
+        dirty.clear()
+
+    def _render_score(self) -> None:
         """将当前得分转换为一幅渲染的图像"""
         # f-string采用 {content:format}设置字符串格式 :后使用,作为千位分隔符
-        self.score_image = self.font.render(f'{round(self.stats.score, -1):,}', True,
-                                            self.text_color, self.settings.bg_color)
+        self.score_image = self.text.render(f'{round(self.stats.score, -1):,}')
         self.score_rect = self.score_image.get_rect()
 
         # 屏幕右上角显示当前得分
         self.screen_rect.top = 20
         self.score_rect.right = self.screen_rect.right - 20
 
-    def prep_high_score(self) -> None:
+    def _render_high_score(self) -> None:
         """将最高得分转换为一幅渲染的图像"""
         # f-string采用 {content:format}设置字符串格式 :后使用,作为千位分隔符
-        self.high_score_image = self.font.render(f'{round(self.stats.high_score, -1):,}', True,
-                                                 self.text_color, self.settings.bg_color)
+        self.high_score_image = self.text.render(f'{round(self.stats.high_score, -1):,}')
         self.high_score_rect = self.high_score_image.get_rect()
 
         # 屏幕顶部中央显示最高得分
         self.high_score_rect.top = self.score_rect.top
         self.high_score_rect.centerx = self.screen_rect.centerx
 
-    def prep_level(self) -> None:
+    def _render_level(self) -> None:
         """将等级转换为一幅渲染的图像"""
-        self.level_image = self.font.render(f'{self.stats.level}', True,
-                                            self.text_color, self.settings.bg_color)
+        self.level_image = self.text.render(f'{self.stats.level}')
         self.level_rect = self.level_image.get_rect()
 
         # 将等级放在得分下方
         self.level_rect.top = self.score_rect.bottom
         self.level_rect.right = self.score_rect.right
 
-    def prep_ships(self) -> None:
-        """显示还剩下多少飞船"""
-        self.ships = Group()
-        for number in range(self.stats.ships_left):
-            ship = Ship(self.screen, self.settings)
+    def _prep_lives_strip(self, count: int) -> None:
+        """将count个飞船图标拼成一条"""
+        width, height = self.ship_icon.get_size()
+        self.lives_strip = Surface((width * count, height))
+        for number in range(count):
+            self.lives_strip.blit(self.ship_icon, (width * number, 0))
+        self._lives_images.clear()
+
+    def _lives_image(self, count: int) -> Surface:
+        """返回显示count个飞船图标的图像, 与图标条共享像素"""
+        image = self._lives_images.get(count)
+        if image is None:
+            width, height = self.ship_icon.get_size()
+            if width * count > self.lives_strip.get_width():
+                self._prep_lives_strip(count)
+            image = self.lives_strip.subsurface((0, 0, width * count, height))
+            self._lives_images[count] = image
+        return image
+
+    def prep_countdown(self, seconds: float) -> None:
+        """将复活倒计时转换为一幅渲染的图像"""
+        self.countdown_image = self.text.render(f'{math.ceil(seconds)}')
+        self.countdown_rect = self.countdown_image.get_rect()
+
+        # 倒计时显示在屏幕中央
+        self.countdown_rect.center = self.screen.get_rect().center
+
+    def show_countdown(self, renderer: Renderer, seconds: float) -> None:
+        """在屏幕中央显示复活倒计时"""
+        self.prep_countdown(seconds)
+        renderer.blit(self.countdown_image, self.countdown_rect)
+
+    def show_score(self, renderer: Renderer, show_lives: bool = True) -> None:
+        """在屏幕上显示得分、等级, show_lives为True时同时显示余下的飞船"""
+        self.flush()
+        # 各元素分别作为叠加内容绘制, 文本渲染器对相同文本返回同一图像,
+        # 因此渲染器只重绘和推送值发生变化的元素
+        renderer.overlay(self.score_image, self.score_rect)
+        renderer.overlay(self.high_score_image, self.high_score_rect)
+        renderer.overlay(self.level_image, self.level_rect)
+        lives = self.stats.ships_left if show_lives else 0
+        if lives > 0:
             # 屏幕左上角显示余下的飞船
-            ship.rect.y = 10
-            ship.rect.x = 10 + ship.rect.width * number
-            self.ships.add(ship)
-
-    def show_score(self) -> None:
-        """在屏幕上显示得分、等级"""
-        self.screen.blit(self.score_image, self.score_rect)
-        self.screen.blit(self.level_image, self.level_rect)
-        self.screen.blit(self.high_score_image, self.high_score_rect)
+            renderer.overlay(self._lives_image(lives), (10, 10))
 
     def check_high_score(self) -> None:
         """检查是否诞生了最高得分"""
         if self.stats.high_score < self.stats.score:
             self.stats.high_score = self.stats.score
             self.prep_high_score()
+            # 刷新最高分时立即保存, 游戏异常退出也不会丢失
+            self.stats.save_score()
@@ -1,3 +1,122 @@
+import argparse
+import ast
+import json
+import os
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from formation import FORMATIONS
+
+try:
+    import tomllib
+except ImportError:  # Python 3.11之前没有tomllib, 只能读取JSON设置文件
+    tomllib = None
+
+# 命名的设置预设, 按 预设 -> 设置文件 -> 命令行覆盖值 的顺序应用
+PRESETS: Dict[str, Dict[str, Any]] = {
+    # 低配置机器: 较低的分辨率、模拟频率和帧率
+    'low-end': {
+        'screen_width': 800,
+        'screen_height': 600,
+        'tick_rate': 60,
+        'max_fps': 30,
+        'dirty_rects': True,
+    },
+    # 压力测试: 大屏幕上的密集外星人群和大量子弹
+    'stress': {
+        'screen_width': 2400,
+        'screen_height': 1600,
+        'formation': 'grid',
+        'bullet_limit': 30,
+        'collision_grid': True,
+        'fleet_rows': True,
+    },
+}
+
+# 必须大于0的设置项
+POSITIVE = {
+    'screen_width', 'screen_height', 'tick_rate', 'ship_limit',
+    'hud_ship_scale', 'bullet_width', 'bullet_height', 'bullet_limit',
+    'collision_cell_size', 'speed_scale', 'score_scale', 'initial_ship_speed',
+    'initial_bullet_speed', 'initial_alien_speed', 'initial_alien_points',
+    'leaderboard_size', 'resolution_scale', 'telemetry_max_bytes', 'telemetry_interval',
+}
+# 不能为负数的设置项
+NON_NEGATIVE = {'max_fps', 'respawn_pause', 'fleet_drop_speed', 'fire_rate',
+                'telemetry_backups'}
+# 开局时重置的动态设置, 只能通过对应的initial_*设置调整
+DYNAMIC = {'ship_speed', 'bullet_speed', 'alien_speed', 'alien_points',
+           'fleet_direction', 'level'}
+
+
+class LevelSettings(NamedTuple):
+    """某一等级的速度和外星人分数"""
+    ship_speed: float
+    bullet_speed: float
+    alien_speed: float
+    alien_points: int
+
+
+def _is_key_names(keys: Any) -> bool:
+    """keys是否为按键名或按键名列表"""
+    if isinstance(keys, str):
+        return True
+    return isinstance(keys, list) and all(isinstance(key, str) for key in keys)
+
+
+def parse_value(text: str) -> Any:
+    """将命令行中的值解析为Python字面量, 无法解析时作为字符串"""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def parse_assignment(text: str) -> Tuple[str, str]:
+    """解析name=value形式的参数"""
+    name, sep, value = text.partition('=')
+    if not sep or not name:
+        raise argparse.ArgumentTypeError(f'应为name=value形式: {text!r}')
+    return name.strip(), value.strip()
+
+
+def resolve_path(path: str) -> str:
+    """相对路径以游戏目录为基准, 不依赖当前工作目录"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """读取TOML(扩展名为.toml)或JSON格式的设置文件"""
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise ValueError(f'读取TOML设置文件需要Python 3.11或更高版本: {path}')
+        with open(path, 'rb') as f:
+            values = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            values = json.load(f)
+    if not isinstance(values, dict):
+        raise ValueError(f'设置文件的顶层应为键值表: {path}')
+    return values
+
+
+def resolve_config(path: Optional[str] = None, preset: Optional[str] = None,
+                   overrides: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """合并预设、设置文件和覆盖值, 未指定preset时使用设置文件中的preset项"""
+    values = load_config(path) if path else {}
+    preset = preset or values.pop('preset', None)
+    values.pop('preset', None)
+
+    merged: Dict[str, Any] = {}
+    if preset:
+        if preset not in PRESETS:
+            raise ValueError(f'未知的预设: {preset}, 可用的预设: {", ".join(PRESETS)}')
+        merged.update(PRESETS[preset])
+        merged['preset'] = preset
+    merged.update(values)
+    merged.update(overrides or {})
+    return merged
+
+
 class Settings:
     """存储《外星人入侵》的所有设置的类"""
 
@@ -9,45 +128,204 @@ class Settings:
         self.title = "Alien Invasion"
         self.bg_color = 230, 230, 230
 
+        # 主循环设置: 每秒模拟步数和每秒最多渲染的帧数(为0时不限制)
+        self.tick_rate = 120
+        self.max_fps = 60
+        # 为True时只重绘并推送发生变化的屏幕区域, 为False时每帧完整重绘
+        self.dirty_rects = True
+
+        # 性能分析设置: 是否记录各阶段耗时、是否显示叠加层, 以及退出时导出的文件
+        self.profile = False
+        self.profile_overlay = True
+        self.profile_export = ''
+
+        # 字体名称, 为空时使用pygame的默认字体
+        self.font_name = ''
+
+        # 图像资源, 相对路径以游戏目录为基准
+        self.ship_image = 'images/ship.bmp'
+        self.alien_image = 'images/alien.bmp'
+        # 飞船、外星人和子弹图像的缩放比例, 在图集中预先缩放, 用于适配不同的分辨率
+        self.resolution_scale = 1.0
+
         # 飞船设置
         self.ship_limit = 3
+        # HUD中剩余飞船图标的缩放比例
+        self.hud_ship_scale = 1.0
+        # 损失飞船后暂停的时间(秒)
+        self.respawn_pause = 1.5
 
         # 子弹设置
         self.bullet_width = 3
         self.bullet_height = 15
         self.bullet_color = 60, 60, 60
         self.bullet_limit = 6
+        # 按住开火键时每秒最多发射的子弹数, 为0时不限制
+        self.fire_rate = 10.0
 
-        # 外星人设置
+        # 按键绑定: 动作 -> pygame.key.name()形式的按键名或按键名列表
+        self.key_bindings = {
+            'left': 'left',
+            'right': 'right',
+            'fire': 'space',
+            'start': 'p',
+            'quit': 'q',
+        }
+
+        # 外星人设置, 外星人群每次改变方向时下移的像素数
         self.fleet_drop_speed = 5
+        # 外星人群的阵型: grid、staggered或wedge
+        self.formation = 'grid'
+
+        # 碰撞检测设置: 为True时使用空间哈希网格, 为False时逐对检测
+        self.collision_grid = True
+        # 空间哈希网格单元格的边长(像素)
+        self.collision_cell_size = 64
+        # 为True时外星人群按行分组, 绘制时跳过与屏幕不重叠的整行,
+        # collision_grid也为True时碰撞检测代替网格跳过与子弹不重叠的整行
+        self.fleet_rows = True
+
+        # 为True且安装了NumPy时, 外星人群和子弹的状态保存在数组中批量更新
+        self.entity_store = False
+
+        # 第1级的速度(像素/秒)和外星人分数
+        self.initial_ship_speed = 300.0
+        self.initial_bullet_speed = 600.0
+        self.initial_alien_speed = 200.0
+        self.initial_alien_points = 50
 
         # 加快游戏节奏的速度
         self.speed_scale = 1.1
         # 外星人分数的提高速度
         self.score_scale = 1.5
 
-        # 保存最高分的文件
+        # 得分数据库, 相对路径以游戏目录为基准; 排行榜按玩家和预设分别保存若干条记录
+        self.score_db = 'scores.db'
+        self.player_name = 'player'
+        self.leaderboard_size = 10
+        # 旧版本保存最高分的文件, 数据库为空时导入其中的最高分
         self.high_score_file = "high_score.txt"
+        # 使用的预设名称, 由Settings.load()记录
+        self.preset = ''
+
+        # 遥测目录, 为空时不记录; 相对路径以游戏目录为基准
+        self.telemetry_dir = ''
+        # 遥测文件的大小上限(字节)和保留的旧文件数
+        self.telemetry_max_bytes = 1_000_000
+        self.telemetry_backups = 5
+        # 帧时间汇总的间隔(秒)
+        self.telemetry_interval = 5.0
+
+        # 各等级的速度和分数表, 决定表内容的设置改变时重新计算
+        self._levels: List[LevelSettings] = []
+        self._levels_key: Optional[tuple] = None
 
         # 初始化随游戏进行而变化的设置
         self.initialize_dynamic_settings()
 
+    @classmethod
+    def load(cls, path: Optional[str] = None, preset: Optional[str] = None,
+             overrides: Optional[Mapping[str, Any]] = None) -> 'Settings':
+        """依次应用预设、设置文件和覆盖值创建设置"""
+        settings = cls()
+        settings.update(resolve_config(path, preset, overrides))
+        return settings
+
+    def non_defaults(self) -> Dict[str, Any]:
+        """返回与默认值不同的静态设置, 传给update()可在新的设置对象上重建"""
+        defaults = type(self)()
+        return {name: value for name, value in vars(self).items()
+                if not name.startswith('_') and name not in DYNAMIC
+                and value != getattr(defaults, name)}
+
+    def update(self, values: Mapping[str, Any]) -> None:
+        """校验并写入设置值, 名称未知或值不合法时引发ValueError"""
+        checked = {name: self._validate(name, value) for name, value in values.items()}
+        for name, value in checked.items():
+            setattr(self, name, value)
+        self.initialize_dynamic_settings()
+
+    def _validate(self, name: str, value: Any) -> Any:
+        """检查单个设置值的类型和范围, 返回转换后的值"""
+        if name in DYNAMIC:
+            raise ValueError(f'{name}在开局时重置, 请设置对应的initial_*项')
+        if name.startswith('_') or name not in vars(self):
+            raise ValueError(f'未知的设置项: {name}')
+
+        default = getattr(self, name)
+        if isinstance(default, bool):
+            if not isinstance(value, bool):
+                raise ValueError(f'{name}应为布尔值: {value!r}')
+        elif isinstance(default, int):
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f'{name}应为整数: {value!r}')
+        elif isinstance(default, float):
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f'{name}应为数值: {value!r}')
+            value = float(value)
+        elif isinstance(default, str):
+            if not isinstance(value, str):
+                raise ValueError(f'{name}应为字符串: {value!r}')
+        elif isinstance(default, tuple):
+            # 颜色: 3个0~255的整数
+            if (not isinstance(value, (list, tuple)) or len(value) != 3
+                    or not all(isinstance(c, int) and 0 <= c <= 255 for c in value)):
+                raise ValueError(f'{name}应为3个0~255的整数: {value!r}')
+            value = tuple(value)
+        elif isinstance(default, dict):
+            # 按键绑定: 只需给出要修改的动作, 其余动作保持原来的按键
+            if not isinstance(value, dict) or not all(
+                    action in default and _is_key_names(keys) for action, keys in value.items()):
+                raise ValueError(f'{name}应为{", ".join(default)}到按键名(或按键名列表)的映射: '
+                                 f'{value!r}')
+            # 按键名是否存在要在初始化pygame后由controls.key_table()检查
+            value = {**default, **value}
+
+        if name in POSITIVE and value <= 0:
+            raise ValueError(f'{name}必须大于0: {value!r}')
+        if name in NON_NEGATIVE and value < 0:
+            raise ValueError(f'{name}不能为负数: {value!r}')
+        if name == 'preset' and value and value not in PRESETS:
+            raise ValueError(f'未知的预设: {value}, 可用的预设: {", ".join(PRESETS)}')
+        if name == 'formation' and value not in FORMATIONS:
+            raise ValueError(f'未知的阵型: {value}, 可用的阵型: {", ".join(FORMATIONS)}')
+        return value
+
+    def level_settings(self, level: int) -> LevelSettings:
+        """返回第level级的速度和外星人分数, 查表得到"""
+        if level < 1:
+            raise ValueError(f'等级从1开始: {level}')
+        key = (self.initial_ship_speed, self.initial_bullet_speed, self.initial_alien_speed,
+               self.initial_alien_points, self.speed_scale, self.score_scale)
+        levels = self._levels
+        if key != self._levels_key:
+            levels.clear()
+            levels.append(LevelSettings(*key[:4]))
+            self._levels_key = key
+
+        # 按需延长等级表, 每级的值由上一级逐步相乘得到, 与逐级提速的结果完全一致
+        while len(levels) < level:
+            last = levels[-1]
+            levels.append(LevelSettings(last.ship_speed * self.speed_scale,
+                                        last.bullet_speed * self.speed_scale,
+                                        last.alien_speed * self.speed_scale,
+                                        int(last.alien_points * self.score_scale)))
+        return levels[level - 1]
+
+    def set_level(self, level: int) -> None:
+        """将速度和外星人分数设为第level级的值"""
+        self.level = level
+        (self.ship_speed, self.bullet_speed, self.alien_speed,
+         self.alien_points) = self.level_settings(level)
+
     def initialize_dynamic_settings(self):
         """初始化游戏的动态设置"""
-        self.ship_speed = 1.5
-        self.bullet_speed = 3.0
-        self.alien_speed = 1.0
+        # 速度的单位均为像素/秒, 玩家每击落一个外星人得到alien_points分
+        self.set_level(1)
 
         # fleet_direction为1表示向右, -1表示向左
         self.fleet_direction = 1
 
-        # 玩家每击落一个外星人得到的分数
-        self.alien_points = 50
-
     def increase_speed(self):
         """提高速度设置和外星人分数"""
-        self.ship_speed *= self.speed_scale
-        self.bullet_speed *= self.speed_scale
-        self.alien_speed *= self.speed_scale
-
-        self.alien_points = int(self.alien_points * self.score_scale)
+        self.set_level(self.level + 1)
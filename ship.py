@@ -1,7 +1,8 @@
-import pygame
 from pygame import Surface
 from pygame.sprite import Sprite
 
+from atlas import sprite_atlas
+from renderer import Renderer
 from settings import Settings
 
 
@@ -15,8 +16,8 @@ class Ship(Sprite):
         self.settings = settings
         self.screen_rect = self.screen.get_rect()
 
-        # 加载飞船的图像并获取其外接矩形
-        self.image = pygame.image.load('images/ship.bmp')
+        # 从图集取得飞船的图像并获取其外接矩形
+        self.image = sprite_atlas.get('ship')
         self.rect = self.image.get_rect()
 
         self.center_ship()
@@ -31,18 +32,22 @@ class Ship(Sprite):
         self.rect.midbottom = self.screen_rect.midbottom
         # 在飞船的属性x中存储小数值
         self.x = float(self.rect.x)
+        # 重新居中时不做插值
+        self.prev_x = self.x
 
-    def update(self) -> None:
-        """根据移动标志调整飞船的位置"""
+    def update(self, dt: float) -> None:
+        """根据移动标志调整飞船的位置, dt为模拟步长(秒)"""
+        self.prev_x = self.x
         # 更新飞船而不是rect对象的x值
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * dt
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * dt
 
         # 根据self.x更新rect对象
         self.rect.x = self.x
 
-    def blit_ship(self) -> None:
-        """在指定位置绘制飞船"""
-        self.screen.blit(self.image, self.rect)
+    def blit_ship(self, renderer: Renderer, alpha: float = 1.0) -> None:
+        """在插值后的位置绘制飞船"""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        renderer.blit(self.image, (x, self.rect.y))
@@ -0,0 +1,154 @@
+"""把游戏和各等级的指标以JSON行的形式写入本地文件的遥测流
+
+每行是一个事件, 包含时间戳、会话编号和事件名称, 例如:
+    {"time": 1760000000.0, "session": "...", "event": "level_clear", "level": 3, ...}
+"""
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+import warnings
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from settings import resolve_path
+
+# 提交给后台线程的事件: 时间戳、事件名称、字段
+Event = Tuple[float, str, Dict[str, Any]]
+
+# 帧时间汇总中的百分位
+PERCENTILES = (50, 95, 99)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """汇总一组耗时(秒), 返回以毫秒表示的平均值、百分位和最大值"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    count = len(ordered)
+    summary = {'count': count, 'mean_ms': sum(ordered) / count * 1000}
+    for percentile in PERCENTILES:
+        index = min(count - 1, int(count * percentile / 100))
+        summary[f'p{percentile}_ms'] = ordered[index] * 1000
+    summary['max_ms'] = ordered[-1] * 1000
+    return summary
+
+
+class Telemetry:
+    """把结构化事件写入轮转JSON行文件的遥测流
+
+    emit()只把事件放入有界队列, 队列已满时丢弃事件并计数, 从不阻塞游戏的帧;
+    序列化、帧时间汇总和磁盘I/O都在后台线程中进行. 文件超过max_bytes后轮转为
+    telemetry.jsonl.1、telemetry.jsonl.2……, 最多保留backups个旧文件
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1_000_000, backups: int = 5,
+                 interval: float = 5.0, max_pending: int = 10_000) -> None:
+        """启动后台写入线程, interval为帧时间汇总的间隔(秒)"""
+        self.directory = resolve_path(directory)
+        self.path = os.path.join(self.directory, 'telemetry.jsonl')
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.interval = interval
+        self.session = uuid.uuid4().hex
+
+        # 因队列已满而丢弃的事件数
+        self.dropped = 0
+        self._queue: 'queue.Queue[Optional[Event]]' = queue.Queue(max_pending)
+
+        # 距上次汇总以来的帧时间和模拟步耗时(秒)
+        self._frame_times = array('d')
+        self._tick_times = array('d')
+        self._elapsed = 0.0
+
+        self._thread = threading.Thread(target=self._run, name='telemetry', daemon=True)
+        self._thread.start()
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """异步记录一个事件, 字段须能序列化为JSON"""
+        try:
+            self._queue.put_nowait((time.time(), event, fields))
+        except queue.Full:
+            self.dropped += 1
+
+    def add_frame(self, frame_time: float, tick_time: float) -> bool:
+        """记录一帧的帧时间和模拟步耗时(秒), 返回是否到了发送帧时间汇总的时候"""
+        self._frame_times.append(frame_time)
+        self._tick_times.append(tick_time)
+        self._elapsed += frame_time
+        return self._elapsed >= self.interval
+
+    def emit_frames(self, **context: Any) -> None:
+        """发送距上次汇总以来的帧时间, 由后台线程汇总, context为附加的游戏状态"""
+        frame_times, self._frame_times = self._frame_times, array('d')
+        tick_times, self._tick_times = self._tick_times, array('d')
+        self._elapsed = 0.0
+        self.emit('frames', frame_times=frame_times, tick_times=tick_times, **context)
+
+    def close(self) -> None:
+        """写入队列中剩余的事件并结束后台线程"""
+        self.emit('session_end', dropped=self.dropped)
+        self._queue.put(None)
+        self._thread.join()
+
+    def _encode(self, item: Event) -> str:
+        """把事件序列化为一行JSON, 帧时间在此汇总"""
+        timestamp, event, fields = item
+        if event == 'frames':
+            fields = dict(fields)
+            fields['frame_time'] = summarize(fields.pop('frame_times'))
+            fields['tick_time'] = summarize(fields.pop('tick_times'))
+        record = {'time': timestamp, 'session': self.session, 'event': event}
+        record.update(fields)
+        return json.dumps(record, ensure_ascii=False) + '\n'
+
+    def _rotate(self) -> None:
+        """将当前文件改名为telemetry.jsonl.1, 已有的旧文件依次后移, 超出数量的删除"""
+        for index in range(self.backups - 1, 0, -1):
+            source = f'{self.path}.{index}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{index + 1}')
+        if self.backups > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+
+    def _write(self, lines: List[str]) -> None:
+        """追加写入事件, 文件超过大小上限时轮转"""
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+            size = f.tell()
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _run(self) -> None:
+        """后台线程: 循环取出队列中的所有事件, 一次写入文件"""
+        failed = False
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            warnings.warn(f'无法创建遥测目录{self.directory}, 本次不记录遥测: {e}')
+            failed = True
+
+        stop = False
+        while not stop:
+            lines = []
+            item = self._queue.get()
+            while True:
+                if item is None:
+                    stop = True
+                else:
+                    lines.append(self._encode(item))
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if failed or not lines:
+                continue
+            try:
+                self._write(lines)
+            except OSError as e:
+                warnings.warn(f'写入遥测文件{self.path}失败, 本次不再记录遥测: {e}')
+                failed = True
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# 测试不需要显示器
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+
+
+@pytest.fixture(autouse=True)
+def game_dir(monkeypatch):
+    """图像资源按相对于游戏目录的路径加载"""
+    monkeypatch.chdir(GAME_DIR)
@@ -0,0 +1,60 @@
+from typing import Tuple
+
+import pygame
+import pytest
+
+from alien_invasion import AlienInvasion
+from entity_store import EntityStore
+from input_source import BotInput
+from settings import Settings
+
+
+def bot_run(seed: int, ticks: int, **overrides) -> Tuple[int, int, int]:
+    """以无窗口模式运行机器人对局, 返回最终的得分、等级和剩余飞船"""
+    settings = Settings()
+    settings.update(overrides)
+    game = AlienInvasion(settings, headless=True, input_source=BotInput(seed))
+    stats = game.run_headless(ticks)
+    return stats.score, stats.level, stats.ships_left
+
+
+@pytest.mark.parametrize('overrides', [
+    {'collision_grid': True, 'fleet_rows': False},
+    {'collision_grid': True, 'fleet_rows': True},
+    {'collision_grid': False, 'fleet_rows': False},
+    {'collision_grid': False, 'fleet_rows': True},
+], ids=['grid', 'rows', 'pairwise', 'pairwise_rows'])
+def test_collision_modes_play_the_same_game(overrides):
+    assert bot_run(3, 20000, **overrides) == (3067126, 17, 2)
+
+
+@pytest.mark.parametrize('fleet_rows', [False, True])
+def test_pairwise_mode_uses_pygame(monkeypatch, fleet_rows):
+    calls = []
+    groupcollide = pygame.sprite.groupcollide
+
+    def counting_groupcollide(*args):
+        calls.append(args)
+        return groupcollide(*args)
+
+    monkeypatch.setattr(pygame.sprite, 'groupcollide', counting_groupcollide)
+    bot_run(3, 500, collision_grid=False, fleet_rows=fleet_rows)
+    assert calls
+
+
+@pytest.mark.skipif(not EntityStore.available, reason='需要NumPy')
+def test_entity_store_plays_the_same_game():
+    assert bot_run(3, 20000, entity_store=True) == (3067126, 17, 2)
+
+
+@pytest.mark.skipif(not EntityStore.available, reason='需要NumPy')
+def test_entity_store_keeps_row_bounds_current():
+    settings = Settings()
+    settings.update({'entity_store': True})
+    game = AlienInvasion(settings, headless=True)
+    game._start_game()
+    for _ in range(500):
+        game._update_aliens(1 / settings.tick_rate)
+    game.store.sync_sprites()
+    for row in game.aliens.rows:
+        assert row.bounds == row.sprites()[0].rect.unionall([alien.rect for alien in row])
@@ -0,0 +1,49 @@
+from typing import List
+
+import pygame
+
+from alien_invasion import AlienInvasion
+from input_source import EventQueueInput
+from settings import Settings
+
+
+def play_frames(dirty_rects: bool) -> List[bytes]:
+    """开始一局不保存得分的游戏, 返回每20帧的屏幕内容"""
+    settings = Settings()
+    settings.update({'dirty_rects': dirty_rects})
+    settings.score_db = ''
+    # 两局共用同一个显示窗口, 因此依次运行
+    game = AlienInvasion(settings)
+    game._start_game()
+    frames = []
+    for frame in range(400):
+        game._update_game(1 / 120)
+        if frame % 15 == 0:
+            game._fire_bullet()
+        if frame == 200:
+            # 剩余飞船的图像缩短, 原来的区域需要擦除
+            game.stats.ships_left -= 1
+        game._update_screen(0.3)
+        if frame % 20 == 0:
+            frames.append(pygame.image.tobytes(game.screen, 'RGB'))
+    assert game.stats.score > 0
+    return frames
+
+
+def test_dirty_rects_draw_the_same_frames():
+    dirty, full = play_frames(True), play_frames(False)
+    for number, (expected, actual) in enumerate(zip(full, dirty)):
+        assert actual == expected, number * 20
+
+
+def test_window_expose_forces_full_redraw():
+    settings = Settings()
+    settings.score_db = ''
+    game = AlienInvasion(settings, input_source=EventQueueInput())
+    game._update_screen()
+    assert not game.renderer._full_redraw
+
+    # 窗口事件不能被事件队列过滤掉
+    pygame.event.post(pygame.event.Event(pygame.WINDOWEXPOSED))
+    game._check_events()
+    assert game.renderer._full_redraw
@@ -0,0 +1,96 @@
+from typing import List
+
+import pygame
+import pytest
+from pygame.event import Event
+
+from alien_invasion import AlienInvasion
+from assets import image_cache
+from input_source import BotInput
+from replay import (InputRecorder, Replay, decode_events, decode_settings, encode_events,
+                    encode_settings, replay)
+from settings import Settings
+
+
+class StartingBot(BotInput):
+    """先按下开始键的机器人, 使开局本身也被录制"""
+
+    def poll(self, game) -> List[Event]:
+        events = super(StartingBot, self).poll(game)
+        if self.tick == 1:
+            events.insert(0, Event(pygame.KEYDOWN, key=pygame.K_p))
+        return events
+
+
+def record(path: str, settings: Settings, seed: int = 3, ticks: int = 6000) -> AlienInvasion:
+    """以无窗口模式录制一局机器人对局"""
+    recorder = InputRecorder(StartingBot(seed), str(path))
+    game = AlienInvasion(settings, headless=True, input_source=recorder)
+    game.run_headless(ticks, start=False)
+    recorder.close(game)
+    return game
+
+
+def test_encode_decode_round_trip():
+    events = [
+        (0, Event(pygame.KEYDOWN, key=pygame.K_p)),
+        (3, Event(pygame.KEYDOWN, key=pygame.K_LEFT)),
+        (3, Event(pygame.KEYUP, key=pygame.K_LEFT)),
+        (70000, Event(pygame.MOUSEBUTTONDOWN, pos=(600, 400), button=1)),
+        (200000, Event(pygame.KEYDOWN, key=pygame.K_SPACE)),
+    ]
+    decoded = decode_events(encode_events(events))
+    assert [(tick, event.type) for tick, event in decoded] == \
+        [(tick, event.type) for tick, event in events]
+    assert [event.key for _, event in decoded if event.type != pygame.MOUSEBUTTONDOWN] == \
+        [event.key for _, event in events if event.type != pygame.MOUSEBUTTONDOWN]
+    assert decoded[3][1].pos == (600, 400)
+
+
+def test_replay_reproduces_recorded_game(tmp_path):
+    path = tmp_path / 'run.airp'
+    game = record(path, Settings())
+    assert game.stats.score > 0
+
+    stats, recording = replay(str(path))
+    assert (recording.score, recording.level) == (game.stats.score, game.stats.level)
+    assert (stats.score, stats.level) == (game.stats.score, game.stats.level)
+
+
+def test_settings_round_trip():
+    settings = Settings()
+    settings.update({'formation': 'wedge', 'fire_rate': 3.0, 'bg_color': [10, 20, 30],
+                     'key_bindings': {'fire': ['space', 'up']}})
+    values, offset = decode_settings(encode_settings(settings) + b'rest')
+    assert values == {'formation': 'wedge', 'fire_rate': 3.0, 'bg_color': [10, 20, 30],
+                      'key_bindings': {**Settings().key_bindings, 'fire': ['space', 'up']}}
+    assert offset == len(encode_settings(settings))
+
+
+@pytest.mark.parametrize('overrides', [
+    {'formation': 'wedge'},
+    {'fire_rate': 3.0},
+    {'formation': 'staggered', 'bullet_limit': 3, 'initial_alien_speed': 250.0},
+], ids=['formation', 'fire_rate', 'several'])
+def test_replay_uses_recorded_settings(tmp_path, overrides):
+    settings = Settings()
+    settings.update(overrides)
+    path = tmp_path / 'run.airp'
+    game = record(path, settings)
+
+    assert Replay(str(path)).settings().non_defaults() == settings.non_defaults()
+    stats, _ = replay(str(path))
+    assert (stats.score, stats.level) == (game.stats.score, game.stats.level)
+    # 按默认设置回放得到不同的结果, 说明录像中的设置确实被使用
+    stats, _ = replay(str(path), Settings())
+    assert (stats.score, stats.level) != (game.stats.score, game.stats.level)
+
+
+def test_replay_from_another_directory(tmp_path, monkeypatch):
+    # 图像等资源的相对路径以游戏目录为基准, 不依赖当前工作目录
+    monkeypatch.chdir(tmp_path)
+    image_cache.invalidate()
+    path = tmp_path / 'run.airp'
+    game = record(path, Settings(), ticks=1000)
+    stats, _ = replay(str(path))
+    assert (stats.score, stats.level) == (game.stats.score, game.stats.level)
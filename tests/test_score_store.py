@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from score_store import ScoreStore
+
+
+def scores(store: ScoreStore):
+    """返回排行榜中的得分"""
+    return [entry.score for entry in store.leaderboard()]
+
+
+def test_leaderboard_keeps_top_scores(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    store = ScoreStore(path, 'player', size=3)
+    assert scores(store) == []
+    for run_scores in ([100, 700], [500], [300], [200], [400]):
+        store.new_run()
+        # 同一局的多次记录只保存最后一次
+        for score in run_scores:
+            store.record(score, 2)
+    store.close()
+    assert scores(store) == [700, 500, 400]
+
+    reopened = ScoreStore(path, 'player', size=3)
+    assert reopened.leaderboard()[0].level == 2
+    assert scores(reopened) == [700, 500, 400]
+    reopened.close()
+    with sqlite3.connect(path) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM scores').fetchone() == (3,)
+
+
+def test_leaderboards_are_separate_per_player_and_preset(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    for player, preset, score in [('a', '', 100), ('b', '', 200), ('a', 'stress', 300)]:
+        store = ScoreStore(path, player, preset)
+        store.record(score, 1)
+        store.close()
+    store = ScoreStore(path, 'a')
+    assert scores(store) == [100]
+    store.close()
+
+
+def test_corrupt_database_warns_and_starts_from_zero(tmp_path):
+    path = tmp_path / 'scores.db'
+    path.write_bytes(b'not a database' * 100)
+    with pytest.warns(UserWarning):
+        store = ScoreStore(str(path), 'player')
+        assert store.high_score == 0
+    store.record(500, 1)
+    store.close()
+    assert store.high_score == 0
+
+
+def test_legacy_high_score_imported_into_empty_database(tmp_path):
+    legacy = tmp_path / 'high_score.txt'
+    legacy.write_text('1234', encoding='utf-8')
+    store = ScoreStore(str(tmp_path / 'scores.db'), 'player', legacy_file=str(legacy))
+    assert scores(store) == [1234]
+    store.close()
+
+
+def test_legacy_high_score_ignored_when_database_has_scores(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    store = ScoreStore(path, 'player')
+    store.record(500, 3)
+    store.close()
+
+    legacy = tmp_path / 'high_score.txt'
+    legacy.write_text('9999', encoding='utf-8')
+    store = ScoreStore(path, 'player', legacy_file=str(legacy))
+    assert scores(store) == [500]
+    store.close()
@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pygame
+import pytest
+
+from controls import key_table
+from settings import Settings
+
+
+def test_settings_do_not_import_pygame():
+    # 批量运行器的主进程只导入settings, pygame只在子进程中导入
+    code = 'import sys, settings; sys.exit("pygame" in sys.modules)'
+    assert subprocess.run([sys.executable, '-c', code]).returncode == 0
+
+
+@pytest.mark.parametrize('bindings', [{'fire': 3}, {'fire': ['space', 3]}, {'jump': 'up'}],
+                         ids=['not_name', 'in_list', 'unknown_action'])
+def test_malformed_key_bindings_raise_value_error(bindings):
+    with pytest.raises(ValueError):
+        Settings().update({'key_bindings': bindings})
+
+
+@pytest.mark.parametrize('bindings', [{'fire': 'nope'}, {'fire': ['space', 'nope']},
+                                      {'fire': 'left'}], ids=['unknown', 'in_list', 'duplicate'])
+def test_invalid_key_names_raise_value_error(bindings):
+    settings = Settings()
+    settings.update({'key_bindings': bindings})
+    pygame.init()
+    with pytest.raises(ValueError):
+        key_table(settings.key_bindings)
+
+
+def test_key_bindings_keep_unchanged_actions():
+    settings = Settings()
+    settings.update({'key_bindings': {'fire': ['space', 'up']}})
+    assert settings.key_bindings == {**Settings().key_bindings, 'fire': ['space', 'up']}
+
+
+@pytest.mark.parametrize('name', ['initialize_dynamic_settings', 'set_level', 'non_defaults',
+                                  '_levels', 'no_such_setting'])
+def test_unknown_names_raise_value_error(name):
+    settings = Settings()
+    with pytest.raises(ValueError):
+        settings.update({name: 5})
+    assert callable(settings.non_defaults)
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import pygame
+from pygame import Surface
+from pygame.font import Font
+
+Color = Tuple[int, int, int]
+
+
+class TextRenderer:
+    """缓存文本渲染结果的类
+
+    数字和千位分隔符预先渲染为单个字形, 由这些字符组成的文本通过拼接字形得到,
+    无需调用font.render; 完整的文本图像保存在LRU缓存中, 重复出现时直接复用
+    """
+
+    def __init__(self, font: Font, color: Color, background: Color,
+                 glyphs: str = '0123456789,', max_strings: int = 64) -> None:
+        """预先渲染字形, max_strings为LRU缓存保存的文本图像数量"""
+        self.font = font
+        self.color = color
+        self.background = background
+        self.max_strings = max_strings
+
+        self.glyphs: Dict[str, Surface] = {
+            char: font.render(char, True, color, background) for char in glyphs}
+        self.height = max(glyph.get_height() for glyph in self.glyphs.values())
+        self._strings: 'OrderedDict[str, Surface]' = OrderedDict()
+
+        # 缓存统计
+        self.hits = 0
+        self.misses = 0
+        self.composed = 0
+
+    def _compose(self, text: str) -> Optional[Surface]:
+        """用缓存的字形拼接文本, 文本含有未缓存的字符时返回None"""
+        glyphs = self.glyphs
+        if not text or any(char not in glyphs for char in text):
+            return None
+        width = sum(glyphs[char].get_width() for char in text)
+        image = Surface((width, self.height))
+        image.fill(self.background)
+        x = 0
+        for char in text:
+            glyph = glyphs[char]
+            image.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return image
+
+    def render(self, text: str) -> Surface:
+        """返回文本的图像, 返回的Surface会被复用, 不应在其上直接绘制"""
+        image = self._strings.get(text)
+        if image is not None:
+            self.hits += 1
+            self._strings.move_to_end(text)
+            return image
+
+        self.misses += 1
+        image = self._compose(text)
+        if image is None:
+            image = self.font.render(text, True, self.color, self.background)
+        else:
+            self.composed += 1
+        if pygame.display.get_surface() is not None:
+            image = image.convert()
+
+        self._strings[text] = image
+        if len(self._strings) > self.max_strings:
+            self._strings.popitem(last=False)
+        return image
+
+    @property
+    def hit_rate(self) -> float:
+        """文本图像缓存的命中率"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """返回缓存的统计信息"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'composed': self.composed,
+            'hit_rate': self.hit_rate,
+            'strings': len(self._strings),
+        }